@@ -0,0 +1,118 @@
+import os
+import io
+import json
+import zlib
+import shutil
+import hashlib
+import zipfile
+import tempfile
+from contextlib import suppress
+from .Checksum import ALGORITHM
+
+COMPRESSED = frozenset(['.7z', '.gz', '.jpeg', '.jpg', '.mp3', '.ogg', '.png', '.rar', '.zip'])
+
+
+def write_member(archive, path, codec, level, data=None):
+    zinfo = zipfile.ZipInfo.from_file(path)
+    if codec == 'Deflate' and level > 0 and path.suffix.lower() not in COMPRESSED:
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        zinfo.compress_level = level
+    with open(path, 'rb') if data is None else io.BytesIO(data) as f, archive.open(zinfo, 'w') as out:
+        shutil.copyfileobj(f, out, 1048576)
+
+
+class BackupStore:
+    def __init__(self, path):
+        self.objectsPath = path / 'Objects'
+        self.snapshotsPath = path / 'Snapshots'
+
+    def get_snapshots(self):
+        try:
+            with os.scandir(self.snapshotsPath) as entries:
+                snapshots = [entry for entry in entries if entry.name.endswith('.json')]
+                snapshots.sort(key=lambda entry: entry.stat().st_mtime)
+        except OSError:
+            return []
+        return [entry.name[:-5] for entry in snapshots]
+
+    def load_snapshot(self, name):
+        try:
+            with open(self.snapshotsPath / f'{name}.json') as f:
+                return json.load(f)['Files']
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError, KeyError):
+            return None
+
+    def get_object_path(self, digest):
+        return self.objectsPath / digest[:2] / digest
+
+    def put_object(self, path, data=None):
+        hasher = hashlib.new(ALGORITHM)
+        compressor = zlib.compressobj()
+        os.makedirs(self.objectsPath, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.objectsPath, suffix='.tmp', delete=False) as out:
+            try:
+                with open(path, 'rb') if data is None else io.BytesIO(data) as f:
+                    while chunk := f.read(1048576):
+                        hasher.update(chunk)
+                        out.write(compressor.compress(chunk))
+                out.write(compressor.flush())
+            except BaseException:
+                out.close()
+                os.remove(out.name)
+                raise
+        digest = hasher.hexdigest()
+        target = self.get_object_path(digest)
+        if os.path.isfile(target):
+            os.remove(out.name)
+        else:
+            os.makedirs(target.parent, exist_ok=True)
+            os.replace(out.name, target)
+        return digest
+
+    def snapshot(self, name, files, advance=None, data=None):
+        snapshots = self.get_snapshots()
+        previous = (self.load_snapshot(snapshots[-1]) if snapshots else None) or {}
+        manifest = {}
+        for path, size in files:
+            key = path.as_posix()
+            stat = os.stat(path)
+            entry = previous.get(key)
+            if data and path in data:
+                entry = [self.put_object(path, data[path]), len(data[path]), stat.st_mtime_ns]
+            elif not entry or entry[1:] != [stat.st_size, stat.st_mtime_ns] or \
+                    not os.path.isfile(self.get_object_path(entry[0])):
+                entry = [self.put_object(path), stat.st_size, stat.st_mtime_ns]
+            manifest[key] = entry
+            if advance:
+                advance(size)
+        os.makedirs(self.snapshotsPath, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=self.snapshotsPath, suffix='.tmp', delete=False) as f:
+            json.dump({'Files': manifest}, f)
+        os.replace(f.name, self.snapshotsPath / f'{name}.json')
+
+    def prune(self, number):
+        snapshots = self.get_snapshots()
+        for name in snapshots[:max(len(snapshots) - number, 0)]:
+            with suppress(OSError):
+                os.remove(self.snapshotsPath / f'{name}.json')
+        used = set()
+        for name in self.get_snapshots():
+            # Objects are kept when any snapshot can't be read
+            if (files := self.load_snapshot(name)) is None:
+                return
+            used.update(entry[0] for entry in files.values())
+        for root, _, files in os.walk(self.objectsPath):
+            for file in files:
+                if file not in used:
+                    with suppress(OSError):
+                        os.remove(os.path.join(root, file))
+
+    def restore(self, name, target):
+        for key, (digest, _, _) in (self.load_snapshot(name) or {}).items():
+            path = target / key
+            os.makedirs(path.parent, exist_ok=True)
+            decompressor = zlib.decompressobj()
+            with open(self.get_object_path(digest), 'rb') as f, open(path, 'wb') as out:
+                while chunk := f.read(1048576):
+                    out.write(decompressor.decompress(chunk))
+                out.write(decompressor.flush())
@@ -0,0 +1,330 @@
+import os
+import json
+import time
+import httpx
+import asyncio
+import hashlib
+import tempfile
+import threading
+from contextlib import suppress
+from .Checksum import ALGORITHM, hash_file
+
+
+class ArchiveCache:
+    def __init__(self, path, size):
+        self.path = path
+        self.indexPath = path / 'Index.json'
+        self.lockPath = path / 'Index.lock'
+        self.size = size * 1048576
+        self.lock = threading.Lock()
+        self.index = None
+
+    def acquire(self):
+        # The cache is shared by every flavor
+        self.lock.acquire()
+        deadline = time.time() + 10
+        while True:
+            try:
+                os.makedirs(self.path, exist_ok=True)
+                os.close(os.open(self.lockPath, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                with suppress(OSError):
+                    if time.time() - os.path.getmtime(self.lockPath) > 60:
+                        os.remove(self.lockPath)
+                        continue
+                if time.time() < deadline:
+                    time.sleep(0.05)
+                    continue
+            except OSError:
+                pass
+            else:
+                self.load_index()
+                return True
+            self.lock.release()
+            return False
+
+    def release(self):
+        self.save_index()
+        with suppress(OSError):
+            os.remove(self.lockPath)
+        self.lock.release()
+
+    def load_index(self):
+        try:
+            with open(self.indexPath) as f:
+                self.index = json.load(f)
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+            self.index = {'Keys': {}, 'Blobs': {}}
+
+    def save_index(self):
+        with suppress(OSError):
+            with tempfile.NamedTemporaryFile('w', dir=self.path, suffix='.tmp', delete_on_close=False) as f:
+                json.dump(self.index, f)
+                f.close()
+                os.replace(f.name, self.indexPath)
+
+    def get_key(self, *parts):
+        return hashlib.sha256('\n'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+    def get_digest(self, payload, algorithm):
+        hasher = hashlib.new(algorithm)
+        while chunk := payload.read(65536):
+            hasher.update(chunk)
+        payload.seek(0)
+        return hasher.hexdigest()
+
+    def get(self, key, digest=None):
+        with self.lock:
+            self.load_index()
+            if (blob := self.index['Keys'].get(key)) is None or blob not in self.index['Blobs']:
+                return None
+            if digest and self.index['Blobs'][blob].get(digest[0].upper()) != digest[1].lower():
+                return None
+        try:
+            payload = open(self.path / f'{blob}.zip', 'rb')
+        except OSError:
+            payload = None
+        if payload and self.get_digest(payload, 'sha256') != blob:
+            payload.close()
+            payload = None
+        if self.acquire():
+            try:
+                if payload and blob in self.index['Blobs']:
+                    self.index['Blobs'][blob]['Accessed'] = time.time()
+                elif not payload and self.index['Keys'].get(key) == blob:
+                    self.index['Keys'].pop(key)
+            finally:
+                self.release()
+        return payload
+
+    def put(self, key, payload, digest=None):
+        hashers = {'sha256': hashlib.sha256()}
+        if digest:
+            hashers[digest[0].lower()] = hashlib.new(digest[0].lower())
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.path, suffix='.tmp', delete=False) as f:
+                while chunk := payload.read(65536):
+                    for hasher in hashers.values():
+                        hasher.update(chunk)
+                    f.write(chunk)
+            payload.seek(0)
+            # Archives that don't match the digest provided by the API are not cached
+            if digest and hashers[digest[0].lower()].hexdigest() != digest[1].lower():
+                os.remove(f.name)
+                return
+            blob = hashers['sha256'].hexdigest()
+            os.replace(f.name, self.path / f'{blob}.zip')
+        except OSError:
+            payload.seek(0)
+            return
+        if self.acquire():
+            try:
+                self.index['Keys'][key] = blob
+                self.index['Blobs'][blob] = {'Size': os.path.getsize(self.path / f'{blob}.zip'),
+                                             'Accessed': time.time(),
+                                             **{k.upper(): v.hexdigest() for k, v in hashers.items() if k != 'sha256'}}
+                self.evict()
+            finally:
+                self.release()
+
+    def evict(self):
+        total = sum(blob['Size'] for blob in self.index['Blobs'].values())
+        for blob in sorted(self.index['Blobs'], key=lambda k: self.index['Blobs'][k]['Accessed']):
+            if total <= self.size:
+                break
+            total -= self.index['Blobs'].pop(blob)['Size']
+            with suppress(OSError):
+                os.remove(self.path / f'{blob}.zip')
+        self.index['Keys'] = {k: v for k, v in self.index['Keys'].items() if v in self.index['Blobs']}
+        with suppress(OSError), os.scandir(self.path) as entries:
+            for entry in entries:
+                name, extension = os.path.splitext(entry.name)
+                if ((extension == '.zip' and name not in self.index['Blobs']) or extension == '.tmp') and \
+                        entry.is_file() and time.time() - entry.stat().st_mtime > 3600:
+                    with suppress(OSError):
+                        os.remove(entry.path)
+
+
+class HTTPCache:
+    def __init__(self, path):
+        self.path = path
+
+    def get_cached(self, url, metadata):
+        try:
+            with open(self.path / f'{metadata["Key"]}.bin', 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+        return httpx.Response(200, headers=metadata['Headers'], content=content, request=httpx.Request('GET', url))
+
+    def write(self, path, content):
+        with tempfile.NamedTemporaryFile(dir=self.path, suffix='.tmp', delete=False) as f:
+            f.write(content)
+        try:
+            os.replace(f.name, path)
+        except OSError:
+            os.remove(f.name)
+            raise
+
+    def save(self, metadata, content=None):
+        with suppress(OSError):
+            os.makedirs(self.path, exist_ok=True)
+            if content is not None:
+                self.write(self.path / f'{metadata["Key"]}.bin', content)
+            self.write(self.path / f'{metadata["Key"]}.json', json.dumps(metadata).encode('utf-8'))
+
+    def drop(self, key):
+        with suppress(OSError):
+            os.remove(self.path / f'{key}.json')
+
+    def load(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        try:
+            with open(self.path / f'{key}.json') as f:
+                metadata = json.load(f)
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+            metadata = None
+        return key, metadata
+
+    def get_headers(self, metadata, headers):
+        headers = dict(headers)
+        if metadata:
+            if 'etag' in metadata['Headers']:
+                headers['If-None-Match'] = metadata['Headers']['etag']
+            if 'last-modified' in metadata['Headers']:
+                headers['If-Modified-Since'] = metadata['Headers']['last-modified']
+        return headers
+
+    def process(self, url, key, metadata, payload, ttl):
+        if payload.status_code == 304 and metadata:
+            if cached := self.get_cached(url, metadata):
+                metadata['Timestamp'] = time.time()
+                self.save(metadata)
+                return cached
+            self.drop(key)
+            return None
+        if payload.status_code == 200 and ('etag' in payload.headers or 'last-modified' in payload.headers or ttl > 0):
+            self.save({'Key': key,
+                       'Timestamp': time.time(),
+                       'Headers': {k: v for k, v in payload.headers.items() if k in
+                                   ['content-type', 'etag', 'last-modified']}},
+                      payload.content)
+        return payload
+
+    def get(self, http, url, ttl=0, **kwargs):
+        headers = kwargs.pop('headers', {})
+        key, metadata = self.load(url)
+        if metadata and time.time() - metadata['Timestamp'] < ttl and (cached := self.get_cached(url, metadata)):
+            return cached
+        try:
+            payload = http.get(url, headers=self.get_headers(metadata, headers), **kwargs)
+        except httpx.RequestError:
+            if metadata and (cached := self.get_cached(url, metadata)):
+                return cached
+            raise
+        if (result := self.process(url, key, metadata, payload, ttl)) is None:
+            result = self.process(url, key, None, http.get(url, headers=headers, **kwargs), ttl)
+        return result
+
+    async def get_async(self, http, url, ttl=0, **kwargs):
+        headers = kwargs.pop('headers', {})
+        key, metadata = await asyncio.to_thread(self.load, url)
+        if metadata and time.time() - metadata['Timestamp'] < ttl and \
+                (cached := await asyncio.to_thread(self.get_cached, url, metadata)):
+            return cached
+        try:
+            payload = await http.get(url, headers=self.get_headers(metadata, headers), **kwargs)
+        except httpx.RequestError:
+            if metadata and (cached := await asyncio.to_thread(self.get_cached, url, metadata)):
+                return cached
+            raise
+        if (result := await asyncio.to_thread(self.process, url, key, metadata, payload, ttl)) is None:
+            payload = await http.get(url, headers=headers, **kwargs)
+            result = await asyncio.to_thread(self.process, url, key, None, payload, ttl)
+        return result
+
+
+class SavedVariablesCache:
+    def __init__(self, path):
+        self.path = path
+        self.data = None
+        self.modified = False
+        self.signatures = {}
+
+    def load(self):
+        if self.data is None:
+            try:
+                with open(self.path) as f:
+                    self.data = json.load(f)
+            except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+                self.data = {}
+
+    def save(self):
+        if not self.modified:
+            return
+        with suppress(OSError):
+            os.makedirs(self.path.parent, exist_ok=True)
+            with open(self.path, 'w') as f:
+                json.dump(self.data, f)
+            self.modified = False
+
+    def get(self, path):
+        self.load()
+        key = path.as_posix()
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature = [stat.st_size, stat.st_mtime_ns]
+        entry = self.data.get(key)
+        if entry and entry['Signature'] == signature:
+            return entry['Data']
+        digest = hash_file(path, [ALGORITHM])[ALGORITHM]
+        self.signatures[key] = [signature, digest]
+        if entry and entry['Hash'] == digest:
+            entry['Signature'] = signature
+            self.modified = True
+            return entry['Data']
+        return None
+
+    def put(self, path, data):
+        key = path.as_posix()
+        if key in self.signatures:
+            signature, digest = self.signatures.pop(key)
+            self.data[key] = {'Signature': signature, 'Hash': digest, 'Data': data}
+            self.modified = True
+
+
+class EncodedStringCache:
+    def __init__(self, path):
+        self.path = path
+        self.used = set()
+
+    def get_path(self, slug):
+        return self.path / f'{hashlib.sha256(slug.encode("utf-8")).hexdigest()}.json'
+
+    def get(self, slug, version):
+        path = self.get_path(slug)
+        self.used.add(path.name)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+            return None
+        return entry['Encoded'] if entry['Slug'] == slug and entry['Version'] == version else None
+
+    def put(self, slug, version, encoded):
+        # Only the latest version of a slug is kept
+        with suppress(OSError):
+            os.makedirs(self.path, exist_ok=True)
+            with open(self.get_path(slug), 'w') as f:
+                json.dump({'Slug': slug, 'Version': version, 'Encoded': encoded}, f)
+
+    def prune(self):
+        # Strings not needed by the last sync were already applied in game
+        with suppress(OSError), os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.name not in self.used:
+                    with suppress(OSError):
+                        os.remove(entry.path)
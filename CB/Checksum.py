@@ -0,0 +1,146 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+import concurrent.futures
+from contextlib import suppress
+
+# Untagged checksums are legacy MD5
+ALGORITHM = 'blake2b'
+
+
+def parse_checksum(checksum):
+    algorithm, _, digest = checksum.rpartition(':')
+    return algorithm or 'md5', digest
+
+
+def hash_file(path, algorithms):
+    hashers = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+    with suppress(FileNotFoundError), open(path, 'rb') as f:
+        while chunk := f.read(1048576):
+            for hasher in hashers.values():
+                hasher.update(chunk)
+    return {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()}
+
+
+def reduce_hashes(digests, algorithm):
+    # Same reduction as checksumdir
+    hasher = hashlib.new(algorithm)
+    for digest in sorted(digests):
+        hasher.update(digest.encode('utf-8'))
+    return hasher.hexdigest() if algorithm == 'md5' else f'{algorithm}:{hasher.hexdigest()}'
+
+
+class ChecksumManifest:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = None
+        self.modified = False
+        self.processThreshold = 67108864
+
+    def load(self):
+        with self.lock:
+            if self.data is None:
+                try:
+                    with open(self.path) as f:
+                        self.data = json.load(f)
+                except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+                    self.data = {}
+
+    def save(self):
+        with self.lock:
+            if not self.modified:
+                return
+            with suppress(OSError):
+                os.makedirs(self.path.parent, exist_ok=True)
+                with tempfile.NamedTemporaryFile('w', dir=self.path.parent, suffix='.tmp', delete_on_close=False) as f:
+                    json.dump(self.data, f, separators=(',', ':'))
+                    f.close()
+                    os.replace(f.name, self.path)
+                self.modified = False
+
+    def forget(self, directories):
+        self.load()
+        with self.lock:
+            for directory in directories:
+                if self.data.pop(directory, None) is not None:
+                    self.modified = True
+
+    def walk(self, path, prefix=''):
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if not entry.is_symlink():
+                        yield from self.walk(entry.path, f'{prefix}{entry.name}/')
+                else:
+                    yield f'{prefix}{entry.name}', entry
+
+    def record(self, root, hashes, algorithm=ALGORITHM):
+        self.load()
+        for name, digest in hashes.items():
+            directory, _, relative = name.partition('/')
+            if not relative:
+                continue
+            try:
+                stat = os.stat(root / name)
+            except OSError:
+                continue
+            with self.lock:
+                self.data.setdefault(directory, {})[relative] = [stat.st_size, stat.st_mtime_ns, stat.st_ino,
+                                                                 {algorithm: digest}]
+                self.modified = True
+
+    def scan(self, root, directory, algorithms):
+        self.load()
+        manifest = self.data.get(directory, {})
+        files = {}
+        pending = []
+        if not os.path.isdir(root / directory):
+            return files, pending
+        for name, entry in self.walk(root / directory):
+            try:
+                stat = entry.stat()
+                signature = [stat.st_size, stat.st_mtime_ns, entry.inode()]
+            except OSError:
+                signature = [None, None, None]
+            if name in manifest and signature[0] is not None and manifest[name][:3] == signature and \
+                    all(algorithm in manifest[name][3] for algorithm in algorithms):
+                files[name] = [*signature, {algorithm: manifest[name][3][algorithm] for algorithm in algorithms}]
+            else:
+                files[name] = [*signature, None]
+                pending.append([directory, name, entry.path])
+        return files, pending
+
+    def hash_files(self, pending, algorithms):
+        paths = [path for _, _, path in pending]
+        algorithms = [algorithms[directory] for directory, _, _ in pending]
+        if sum(os.path.getsize(path) if os.path.isfile(path) else 0 for path in paths) < self.processThreshold:
+            return map(hash_file, paths, algorithms)
+        workers = os.cpu_count() or 1
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+                                                    mp_context=multiprocessing.get_context('spawn')) as executor:
+            return list(executor.map(hash_file, paths, algorithms, chunksize=max(1, len(paths) // (workers * 4))))
+
+    def dirhashes(self, root, directories):
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            scans = dict(zip(directories, executor.map(lambda d: self.scan(root, d, directories[d]), directories),
+                             strict=True))
+        pending = [file for _, stale in scans.values() for file in stale]
+        for [directory, name, _], digests in zip(pending, self.hash_files(pending, directories), strict=True):
+            scans[directory][0][name][3] = digests
+        output = {}
+        for directory, (files, _) in scans.items():
+            with self.lock:
+                if files != self.data.get(directory):
+                    self.data[directory] = files
+                    self.modified = True
+            output[directory] = {algorithm: reduce_hashes([file[3][algorithm] for file in files.values()], algorithm)
+                                 for algorithm in directories[directory]}
+        return output
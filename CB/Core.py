@@ -7,20 +7,25 @@ import gzip
 import glob
 import httpx
 import shutil
+import asyncio
 import zipfile
 import hashlib
 import datetime
+import threading
 import concurrent.futures
 from pathlib import Path
-from collections import Counter
-from checksumdir import dirhash
+from contextlib import suppress
 from urllib.parse import quote_plus
-from rich.progress import Progress, BarColumn
+from rich.progress import Progress, BarColumn, DownloadColumn
 from . import retry, APIAuth, __version__
-from .Tukui import TukuiAddon
-from .GitHub import GitHubAddon, GitHubAddonRaw
-from .WagoAddons import WagoAddonsAddon
-from .WoWInterface import WoWInterfaceAddon
+from .Cache import ArchiveCache, HTTPCache
+from .Backup import BackupStore, write_member
+from .Engine import AsyncEngine
+from .Checksum import ALGORITHM, ChecksumManifest, parse_checksum
+from .Tukui import TukuiAddon, AsyncTukuiAddon
+from .GitHub import GitHubAddon, GitHubAddonRaw, AsyncGitHubAddon, AsyncGitHubAddonRaw
+from .WagoAddons import WagoAddonsAddon, AsyncWagoAddonsAddon
+from .WoWInterface import WoWInterfaceAddon, AsyncWoWInterfaceAddon
 
 
 class Core:
@@ -32,7 +37,10 @@ class Core:
         self.clientType = None
         self.config = None
         self.masterConfig = None
-        self.dirIndex = None
+        self.urlIndex = {}
+        self.nameIndex = {}
+        self.dirIndex = {}
+        self.dirsIndex = {}
         self.wowiCache = {}
         self.wagoCache = {}
         self.githubCache = {}
@@ -40,11 +48,20 @@ class Core:
         self.wagoIdCache = None
         self.tukuiCache = None
         self.checksumCache = {}
+        self.bulkEvents = {}
+        self.manifest = ChecksumManifest(Path('WTF/CurseBreaker/Manifest.json'))
+        self.archiveCache = None
+        self.httpCache = HTTPCache(Path('WTF/CurseBreaker/HTTP'))
+        self.backupStore = BackupStore(Path('WTF-Backup'))
+        self.backupFiles = None
+        self.backupSnapshot = None
+        self.installClaims = set()
+        self.installLock = threading.Condition()
 
     def init_master_config(self):
         try:
             self.masterConfig = json.load(gzip.open(io.BytesIO(
-                self.http.get('https://cursebreaker.acidweb.dev/config-v2.json.gz').content)))
+                self.httpCache.get(self.http, 'https://cursebreaker.acidweb.dev/config-v2.json.gz', 3600).content)))
         except (StopIteration, UnicodeDecodeError, json.JSONDecodeError, httpx.RequestError) as e:
             raise RuntimeError('Failed to fetch the master config file. '
                                'Check your connectivity to Google Cloud.') from e
@@ -64,7 +81,8 @@ class Core:
             self.config = {'Addons': [],
                            'WAStash': [],
                            'IgnoreClientVersion': {},
-                           'Backup': {'Enabled': True, 'Number': 7},
+                           'Backup': {'Enabled': True, 'Number': 7, 'Incremental': False, 'Codec': 'Deflate',
+                                      'Level': 6, 'Include': [], 'Exclude': ['*.bak', '*.old'], 'MaxFileSize': 0},
                            'Version': __version__,
                            'WAUsername': '',
                            'WAAccountName': '',
@@ -76,15 +94,31 @@ class Core:
                            'AutoUpdate': True,
                            'ShowAuthors': True,
                            'ShowSources': False,
-                           'AutoUpdateDelay': True}
+                           'AutoUpdateDelay': True,
+                           'ArchiveCacheSize': 512}
             self.save_config()
         if not os.path.isdir('WTF-Backup') and self.config['Backup']['Enabled']:
             os.mkdir('WTF-Backup')
         self.update_config()
+        if self.config['Backup']['Codec'] not in ['Deflate', 'Store'] or \
+                not isinstance(self.config['Backup']['Level'], int) or self.config['Backup']['Level'] not in range(10):
+            raise RuntimeError('The backup codec has to be Deflate or Store and the level a number from 0 to 9.')
+        self.build_index()
+        if self.config['ArchiveCacheSize'] > 0:
+            self.archiveCache = ArchiveCache(Path('../CurseBreaker/Archives'), self.config['ArchiveCacheSize'])
 
     def save_config(self):
-        with open(self.configPath, 'w') as outfile:
-            json.dump(self.config, outfile, sort_keys=True, indent=4, separators=(',', ': '))
+        temp = self.configPath.with_name(f'.{self.configPath.name}.tmp')
+        try:
+            with open(temp, 'w') as outfile:
+                json.dump(self.config, outfile, sort_keys=True, indent=4, separators=(',', ': '))
+            with suppress(OSError):
+                shutil.copymode(self.configPath, temp)
+            os.replace(temp, self.configPath)
+        except BaseException:
+            with suppress(OSError):
+                os.remove(temp)
+            raise
 
     def update_config(self):
         if 'Version' in self.config.keys() and self.config['Version'] == __version__:
@@ -97,10 +131,7 @@ class Core:
         for addon in self.config['Addons']:
             # 1.1.0
             if 'Checksums' not in addon.keys():
-                checksums = {}
-                for directory in addon['Directories']:
-                    checksums[directory] = dirhash(self.path / directory)
-                addon['Checksums'] = checksums
+                addon['Checksums'] = self.get_checksums(addon['Directories'])
             # 1.1.1
             if addon['Version'] is None:
                 addon['Version'] = '1'
@@ -139,9 +170,18 @@ class Core:
                     ['4.0.0', 'WAAAPIKey', ''],
                     ['4.0.0', 'CBCompanionVersion', 0],
                     ['4.2.0', 'ShowSources', False],
-                    ['4.7.0', 'AutoUpdateDelay', True]]:
+                    ['4.7.0', 'AutoUpdateDelay', True],
+                    ['4.9.0', 'ArchiveCacheSize', 512]]:
             if add[1] not in self.config.keys():
                 self.config[add[1]] = add[2]
+        for add in [['4.9.0', 'Incremental', False],
+                    ['4.9.0', 'Codec', 'Deflate'],
+                    ['4.9.0', 'Level', 6],
+                    ['4.9.0', 'Include', []],
+                    ['4.9.0', 'Exclude', ['*.bak', '*.old']],
+                    ['4.9.0', 'MaxFileSize', 0]]:
+            if add[1] not in self.config['Backup'].keys():
+                self.config['Backup'][add[1]] = add[2]
         for delete in [['1.3.0', 'URLCache'],
                        ['3.0.1', 'CurseCache'],
                        ['4.0.0', 'CFCacheCloudFlare'],
@@ -153,15 +193,39 @@ class Core:
         self.config['Version'] = __version__
         self.save_config()
 
-    def check_if_installed(self, url):
+    def build_index(self):
+        self.urlIndex = {}
+        self.nameIndex = {}
+        self.dirIndex = {}
+        self.dirsIndex = {}
         for addon in self.config['Addons']:
-            if url in (addon['URL'], addon['Name']):
-                return addon
+            self.index_addon(addon)
+
+    def index_addon(self, addon):
+        self.urlIndex.setdefault(addon['URL'], []).append(addon)
+        self.nameIndex.setdefault(addon['Name'], []).append(addon)
+        self.dirsIndex.setdefault(tuple(sorted(addon['Directories'])), []).append(addon)
+        for directory in addon['Directories']:
+            self.dirIndex.setdefault(directory, []).append(addon)
+
+    def unindex_addon(self, addon):
+        for index, keys in [[self.urlIndex, [addon['URL']]],
+                            [self.nameIndex, [addon['Name']]],
+                            [self.dirsIndex, [tuple(sorted(addon['Directories']))]],
+                            [self.dirIndex, addon['Directories']]]:
+            for key in keys:
+                if key in index:
+                    index[key] = [a for a in index[key] if a is not addon]
+                    if not index[key]:
+                        del index[key]
+
+    def check_if_installed(self, url):
+        if addons := self.urlIndex.get(url) or self.nameIndex.get(url):
+            return addons[0]
 
     def check_if_installed_dirs(self, directories):
-        for addon in self.config['Addons']:
-            if Counter(directories) == Counter(addon['Directories']):
-                return addon
+        if addons := self.dirsIndex.get(tuple(sorted(directories))):
+            return addons[0]
 
     def check_if_dev(self, url):
         if addon := self.check_if_installed(url):
@@ -170,17 +234,13 @@ class Core:
             return 0
 
     def check_if_overlap(self):
-        directories = []
-        found = set()
-        for addon in self.config['Addons']:
-            directories = directories + addon['Directories']
-        if dupes := [x for x in directories if x in found or found.add(x)]:
-            addons = []
-            for addon in self.config['Addons']:
-                if set(addon['Directories']).intersection(dupes):
-                    addons.append(addon['Name'])
-            addons.sort()
-            return '\n'.join(addons)
+        addons = {}
+        for owners in self.dirIndex.values():
+            if len(owners) > 1:
+                for addon in owners:
+                    addons[id(addon)] = addon['Name']
+        if addons:
+            return '\n'.join(sorted(addons.values()))
         else:
             return False
 
@@ -206,29 +266,30 @@ class Core:
         if len(directories) > 0:
             for directory in directories:
                 shutil.rmtree(self.path / directory, ignore_errors=True)
+            self.manifest.forget(directories)
 
-    def parse_url(self, url):
+    def parse_url(self, url, engine=None):
+        http = engine.http if engine else self.http
         if url.startswith('https://addons.wago.io/addons/'):
-            return WagoAddonsAddon(url, self.wagoCache,
-                                   'retail' if url in self.config['IgnoreClientVersion'].keys() else self.clientType,
-                                   self.masterConfig['ClientTypes'][self.clientType]['CurrentVersion'],
-                                   self.check_if_dev(url), self.config['WAAAPIKey'], self.http)
+            return (AsyncWagoAddonsAddon if engine else WagoAddonsAddon)(
+                url, self.wagoCache, 'retail' if url in self.config['IgnoreClientVersion'].keys() else self.clientType,
+                self.masterConfig['ClientTypes'][self.clientType]['CurrentVersion'], self.check_if_dev(url),
+                self.config['WAAAPIKey'], http, self.archiveCache)
         elif url.startswith('https://www.wowinterface.com/downloads/'):
-            return WoWInterfaceAddon(url, self.wowiCache, self.http)
+            return (AsyncWoWInterfaceAddon if engine else WoWInterfaceAddon)(url, self.wowiCache, http,
+                                                                             self.archiveCache)
         elif url.startswith('https://github.com/'):
-            return GitHubAddon(url, self.githubCache, self.githubPackagerCache, self.clientType,
-                               self.config['GHAPIKey'], self.http)
-        elif url.lower() == 'elvui':
-            self.bulk_tukui_check()
-            return TukuiAddon('elvui', self.tukuiCache,
-                              self.masterConfig['ClientTypes'][self.clientType]['CurrentVersion'], self.http)
-        elif url.lower() == 'tukui':
+            return (AsyncGitHubAddon if engine else GitHubAddon)(url, self.githubCache, self.githubPackagerCache,
+                                                                 self.clientType, self.config['GHAPIKey'], http,
+                                                                 self.archiveCache, self.httpCache)
+        elif url.lower() in ['elvui', 'tukui']:
             self.bulk_tukui_check()
-            return TukuiAddon('tukui', self.tukuiCache,
-                              self.masterConfig['ClientTypes'][self.clientType]['CurrentVersion'], self.http)
+            return (AsyncTukuiAddon if engine else TukuiAddon)(
+                url.lower(), self.tukuiCache, self.masterConfig['ClientTypes'][self.clientType]['CurrentVersion'],
+                http, self.archiveCache)
         elif url.lower() in self.masterConfig['CustomRepository'].keys():
-            return GitHubAddonRaw(self.masterConfig['CustomRepository'][url.lower()], self.config['GHAPIKey'],
-                                  self.http)
+            return (AsyncGitHubAddonRaw if engine else GitHubAddonRaw)(
+                self.masterConfig['CustomRepository'][url.lower()], self.config['GHAPIKey'], http, self.archiveCache)
         elif url.startswith('https://www.townlong-yak.com/addons/'):
             raise RuntimeError(f'{url}\nTownlong Yak is no longer supported by this application.')
         elif url.startswith('https://www.curseforge.com/wow/addons/'):
@@ -262,15 +323,13 @@ class Core:
         if addon := self.check_if_installed_dirs(new.directories):
             return False, addon['Name'], addon['Version']
         self.cleanup(new.directories)
-        new.install(self.path)
-        checksums = {}
-        for directory in new.directories:
-            checksums[directory] = dirhash(self.path / directory)
+        self.manifest.record(self.path, new.install(self.path))
         self.config['Addons'].append({'Name': new.name,
                                       'URL': url,
                                       'Version': new.currentVersion,
                                       'Directories': new.directories,
-                                      'Checksums': checksums})
+                                      'Checksums': self.get_checksums(new.directories)})
+        self.index_addon(self.config['Addons'][-1])
         self.save_config()
         return True, new.name, new.currentVersion
 
@@ -297,15 +356,17 @@ class Core:
             if not keep:
                 self.cleanup(old['Directories'])
             self.config['IgnoreClientVersion'].pop(old['URL'], None)
+            for addon in self.urlIndex.get(url, []) + self.nameIndex.get(url, []):
+                self.unindex_addon(addon)
             self.config['Addons'][:] = [d for d in self.config['Addons'] if d.get('URL') != url
                                         and d.get('Name') != url]
             self.save_config()
             return old['Name'], old['Version']
         return False, False
 
-    def update_addon(self, url, update, force):
+    def update_addon_prepare(self, url):
         if not (old := self.check_if_installed(url)):
-            return url, [], False, False, None, False, False, '?', None, None, None
+            return {'result': (url, [], False, False, None, False, False, '?', None, None, None)}
         dev = self.check_if_dev(old['URL'])
         blocked = self.check_if_blocked(old)
         oldversion = old['Version']
@@ -313,46 +374,150 @@ class Core:
         if old['URL'].startswith(('https://www.townlong-yak.com/addons/',
                                   'https://www.curseforge.com/wow/addons/',
                                   'https://www.tukui.org/')):
-            return old['Name'], [], oldversion, oldversion, None, modified, blocked, 'Unsupported', old['URL'], \
-                       None, dev
+            return {'result': (old['Name'], [], oldversion, oldversion, None, modified, blocked, 'Unsupported',
+                               old['URL'], None, dev)}
         source, sourceurl = self.parse_url_source(old['URL'])
-        new = self.parse_url(old['URL'])
-        if force or (new.currentVersion != old['Version'] and update and not modified and not blocked):
-            new.get_addon()
-            self.cleanup(old['Directories'])
-            new.install(self.path)
-            checksums = {}
-            for directory in new.directories:
-                checksums[directory] = dirhash(self.path / directory)
+        return {'old': old, 'dev': dev, 'blocked': blocked, 'modified': modified, 'oldversion': oldversion,
+                'source': source, 'sourceurl': sourceurl}
+
+    def update_addon_plan(self, job, new, update, force):
+        job['new'] = new
+        job['install'] = force or (new.currentVersion != job['old']['Version'] and update and not job['modified'] and
+                                   not job['blocked'])
+        job['force'] = force
+
+    async def update_addon_async(self, engine, url, update, force, installed):
+        job = await asyncio.to_thread(self.update_addon_prepare, url)
+        if 'result' in job:
+            return job
+        if event := self.bulkEvents.get(job['old']['URL']):
+            await engine.wait(event)
+        if job['old']['URL'].lower() in ['elvui', 'tukui']:
+            await asyncio.to_thread(self.bulk_tukui_check)
+        new = self.parse_url(job['old']['URL'], engine)
+        async with engine.metadataLimit:
+            await new.get_metadata()
+        self.update_addon_plan(job, new, update, force)
+        if job['install']:
+            async with engine.downloadLimit:
+                await new.get_addon()
+            await engine.install(self.update_addon_install, job, installed)
+        return job
+
+    def update_addon_install(self, job, installed):
+        if 'result' in job or not job['install']:
+            return job
+        directories = set(job['old']['Directories']) | set(job['new'].directories)
+        # Addons that share directories can't be extracted at the same time
+        with self.installLock:
+            self.installLock.wait_for(lambda: self.installClaims.isdisjoint(directories))
+            self.installClaims |= directories
+        try:
+            self.cleanup(job['old']['Directories'])
+            self.manifest.record(self.path, job['new'].install(self.path))
+            job['checksums'] = self.get_checksums(job['new'].directories)
+            installed[id(job)] = job
+        finally:
+            with self.installLock:
+                self.installClaims -= directories
+                self.installLock.notify_all()
+        return job
+
+    def update_addon_commit(self, job):
+        if 'result' in job:
+            return job['result']
+        old = job['old']
+        new = job['new']
+        modified = job['modified']
+        blocked = job['blocked']
+        if job['install']:
+            self.unindex_addon(old)
             old['Name'] = new.name
             old['Version'] = new.currentVersion
             old['Directories'] = new.directories
-            old['Checksums'] = checksums
-            self.save_config()
-        if force:
+            old['Checksums'] = job['checksums']
+            self.index_addon(old)
+        if job['force']:
             modified = False
             blocked = False
-        return new.name, new.author, new.currentVersion, oldversion, new.uiVersion, modified, blocked, source, \
-            sourceurl, new.changelogUrl, dev
+        return new.name, new.author, new.currentVersion, job['oldversion'], new.uiVersion, modified, blocked, \
+            job['source'], job['sourceurl'], new.changelogUrl, job['dev']
 
-    def check_checksum(self, addon, pbar=None):
-        checksums = {}
+    def update_addons(self, urls, update, force):
+        installed = {}
+        try:
+            with AsyncEngine() as engine:
+                workers = [engine.submit(self.update_addon_async(engine, url, update, force, installed))
+                           for url in urls]
+                try:
+                    for worker in workers:
+                        try:
+                            job = worker.result()
+                            extracted = installed.pop(id(job), None)
+                            result = self.update_addon_commit(job)
+                            if extracted:
+                                self.save_config()
+                        except Exception as e:
+                            result = e
+                        yield result
+                finally:
+                    for worker in workers:
+                        worker.cancel()
+        finally:
+            if installed:
+                for job in installed.values():
+                    self.update_addon_commit(job)
+                self.save_config()
+            self.manifest.save()
+
+    def get_checksums(self, directories):
+        checksums = self.manifest.dirhashes(self.path, {directory: [ALGORITHM] for directory in directories})
+        return {directory: checksum[ALGORITHM] for directory, checksum in checksums.items()}
+
+    def get_checksum_request(self, addon, request):
         for directory in addon['Directories']:
             if os.path.isdir(self.path / directory):
-                checksums[directory] = dirhash(self.path / directory)
-        if pbar:
-            pbar.update(0, advance=0.5, refresh=True)
-        return addon['URL'], len(checksums.items() & addon['Checksums'].items()) != len(addon['Checksums'])
+                algorithm = parse_checksum(addon['Checksums'][directory])[0] if directory in addon['Checksums'] \
+                    else ALGORITHM
+                request[directory] = sorted({*request.get(directory, []), algorithm, ALGORITHM})
+        return request
+
+    def parse_checksum_result(self, addon, result):
+        checksums = {}
+        for directory in addon['Directories']:
+            if directory in result:
+                algorithm = parse_checksum(addon['Checksums'][directory])[0] if directory in addon['Checksums'] \
+                    else ALGORITHM
+                checksums[directory] = result[directory][algorithm]
+        modified = len(checksums.items() & addon['Checksums'].items()) != len(addon['Checksums'])
+        migrated = None
+        if not modified:
+            migrated = {directory: result[directory][ALGORITHM] for directory in checksums}
+            if migrated == addon['Checksums']:
+                migrated = None
+        return addon['URL'], modified, migrated
+
+    def check_checksum(self, addon):
+        return self.parse_checksum_result(addon, self.manifest.dirhashes(self.path,
+                                                                         self.get_checksum_request(addon, {})))
 
     def bulk_check_checksum(self, addons, pbar):
         self.checksumCache = {}
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            workers = []
-            for addon in addons:
-                workers.append(executor.submit(self.check_checksum, addon, pbar))
-            for future in concurrent.futures.as_completed(workers):
-                output = future.result()
-                self.checksumCache[output[0]] = output[1]
+        request = {}
+        for addon in addons:
+            self.get_checksum_request(addon, request)
+        result = self.manifest.dirhashes(self.path, request)
+        migrated = False
+        for addon in addons:
+            output = self.parse_checksum_result(addon, result)
+            self.checksumCache[output[0]] = output[1]
+            if output[2]:
+                addon['Checksums'] = output[2]
+                migrated = True
+            pbar.update(0, advance=0.5, refresh=True)
+        if migrated:
+            self.save_config()
+        self.manifest.save()
 
     def dev_toggle(self, url):
         if url == 'global':
@@ -397,39 +562,78 @@ class Core:
     def backup_check(self):
         if not self.config['Backup']['Enabled']:
             return False
-        if os.path.isfile(Path('WTF-Backup', f'{datetime.datetime.now().strftime("%d%m%y")}.zip')):
+        if self.config['Backup']['Incremental']:
+            if datetime.datetime.now().strftime('%d%m%y') in self.backupStore.get_snapshots():
+                return False
+        elif os.path.isfile(Path('WTF-Backup', f'{datetime.datetime.now().strftime("%d%m%y")}.zip')):
             return False
+        self.backupFiles = self.get_backup_files()
+        self.backupSnapshot = self.get_backup_snapshot()
+        if not self.backupFiles or self.config['Backup']['Incremental']:
+            return bool(self.backupFiles)
         listofbackups = [Path(x) for x in glob.glob('WTF-Backup/*.zip')]
         if len(listofbackups) >= self.config['Backup']['Number']:
             oldest_file = min(listofbackups, key=os.path.getctime)
             os.remove(oldest_file)
         return True
 
+    def get_backup_files(self, path=Path('WTF')):
+        output = []
+        include = self.config['Backup']['Include']
+        exclude = self.config['Backup']['Exclude']
+        limit = self.config['Backup']['MaxFileSize'] * 1048576
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    entrypath = Path(entry.path)
+                    if any(entrypath.match(pattern) for pattern in exclude):
+                        continue
+                    if entry.is_dir():
+                        if entrypath != Path('WTF/CurseBreaker'):
+                            output.extend(self.get_backup_files(entrypath))
+                    elif entry.name[0] != '.' and (not include or any(entrypath.match(p) for p in include)):
+                        size = entry.stat().st_size
+                        if not limit or size <= limit:
+                            output.append((entrypath, size))
+        except OSError:
+            pass
+        return output
+
+    def get_backup_snapshot(self):
+        with suppress(OSError), open(self.configPath, 'rb') as f:
+            return {self.configPath: f.read()}
+        return {}
+
+    def get_backup_name(self, names, extension=''):
+        name = datetime.datetime.now().strftime('%d%m%y')
+        suffix = 1
+        while f'{name}{extension}' in names:
+            name = f'{datetime.datetime.now().strftime("%d%m%y")}-{suffix}'
+            suffix += 1
+        return name
+
     def backup_wtf(self, console):
-        archive = Path('WTF-Backup', f'{datetime.datetime.now().strftime("%d%m%y")}.zip')
-        if os.path.isfile(archive):
-            suffix = 1
-            while True:
-                archive = Path('WTF-Backup', f'{datetime.datetime.now().strftime("%d%m%y")}-{suffix}.zip')
-                if not os.path.isfile(archive):
-                    break
-                suffix += 1
-        zipf = zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED)
-        filecount = 0
-        for _, _, files in os.walk('WTF/', topdown=True, followlinks=True):
-            files = [f for f in files if f[0] != '.']
-            filecount += len(files)
-        if filecount > 0:
-            with Progress('{task.completed}/{task.total}', '|', BarColumn(bar_width=None), '|', auto_refresh=False,
-                          console=console) as progress:
-                task = progress.add_task('', total=filecount)
-                while not progress.finished:
-                    for root, _, files in os.walk('WTF/', topdown=True, followlinks=True):
-                        files = [f for f in files if f[0] != '.']
-                        for f in files:
-                            zipf.write(Path(root, f))
-                            progress.update(task, advance=1, refresh=True)
-        zipf.close()
+        if self.backupFiles is None:
+            self.backupFiles = self.get_backup_files()
+            self.backupSnapshot = self.get_backup_snapshot()
+        files = self.backupFiles
+        snapshot = self.backupSnapshot
+        self.backupFiles = None
+        self.backupSnapshot = None
+        with Progress(DownloadColumn(), '|', BarColumn(bar_width=None), '|', auto_refresh=False,
+                      console=console) as progress:
+            task = progress.add_task('', total=sum(size for _, size in files))
+            if self.config['Backup']['Incremental']:
+                self.backupStore.snapshot(self.get_backup_name(self.backupStore.get_snapshots()), files,
+                                          lambda size: progress.update(task, advance=size, refresh=True), snapshot)
+                self.backupStore.prune(self.config['Backup']['Number'])
+                return
+            archive = Path('WTF-Backup', f'{self.get_backup_name(os.listdir("WTF-Backup"), ".zip")}.zip')
+            with zipfile.ZipFile(archive, 'w') as zipf:
+                for path, size in files:
+                    write_member(zipf, path, self.config['Backup']['Codec'], self.config['Backup']['Level'],
+                                 snapshot.get(path))
+                    progress.update(task, advance=size, refresh=True)
 
     def find_orphans(self):
         orphanedaddon = []
@@ -504,24 +708,45 @@ class Core:
         payload = payload.json()
         return f'https://addons.wago.io/addons/{payload["slug"]}'
 
-    def bulk_check(self, addons):
-        ids_wowi = []
-        ids_wago = []
-        ids_gh = []
+    def bulk_check_plan(self, addons):
+        checks = {}
         for addon in addons:
             if addon['URL'].startswith('https://www.wowinterface.com/downloads/'):
-                ids_wowi.append(re.findall(r'\d+', addon['URL'])[0].strip())
+                source, check, addonid = 'WoWI', self.bulk_wowi_check, re.findall(r'\d+', addon['URL'])[0].strip()
             elif addon['URL'].startswith('https://addons.wago.io/addons/') and \
-                    addon['URL'] not in self.config['IgnoreClientVersion'].keys():
-                ids_wago.append({'slug': addon['URL'].replace('https://addons.wago.io/addons/', ''), 'id': ''})
-            elif addon['URL'].startswith('https://github.com/'):
-                ids_gh.append(addon['URL'].replace('https://github.com/', ''))
-        if ids_wowi:
-            self.bulk_wowi_check(ids_wowi)
-        if ids_wago and self.config['WAAAPIKey'] != '':
-            self.bulk_wago_check(ids_wago)
-        if ids_gh and self.config['GHAPIKey'] != '':
-            self.bulk_gh_check(ids_gh)
+                    addon['URL'] not in self.config['IgnoreClientVersion'].keys() and self.config['WAAAPIKey'] != '':
+                source, check, addonid = 'Wago', self.bulk_wago_check, \
+                    {'slug': addon['URL'].replace('https://addons.wago.io/addons/', ''), 'id': ''}
+            elif addon['URL'].startswith('https://github.com/') and self.config['GHAPIKey'] != '':
+                source, check, addonid = 'GitHub', self.bulk_gh_check, addon['URL'].replace('https://github.com/', '')
+            else:
+                continue
+            checks.setdefault(source, [check, [], threading.Event()])[1].append(addonid)
+            self.bulkEvents[addon['URL']] = checks[source][2]
+        return checks
+
+    def bulk_check(self, checks):
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+                workers = [executor.submit(self.bulk_check_worker, *check) for check in checks.values()]
+        finally:
+            for event in self.bulkEvents.values():
+                event.set()
+        for worker in workers:
+            worker.result()
+
+    def bulk_check_worker(self, check, ids, event):
+        try:
+            check(ids)
+        finally:
+            event.set()
+
+    def bulk_check_start(self, addons):
+        self.bulkEvents = {}
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(self.bulk_check, self.bulk_check_plan(addons))
+        executor.shutdown(wait=False)
+        return future
 
     def bulk_wowi_check(self, ids):
         payload = self.http.get(f'https://api.mmoui.com/v3/game/WOW/filedetails/{",".join(ids)}.json',
@@ -532,8 +757,8 @@ class Core:
 
     def bulk_wago_check(self, ids):
         if not self.wagoIdCache:
-            self.wagoIdCache = self.http.get(f'https://addons.wago.io/api/data/slugs?game_version={self.clientType}',
-                                             timeout=15)
+            self.wagoIdCache = self.httpCache.get(self.http, f'https://addons.wago.io/api/data/slugs?game_version='
+                                                             f'{self.clientType}', 86400, timeout=15)
             self.parse_wagoaddons_error(self.wagoIdCache.status_code)
             self.wagoIdCache = self.wagoIdCache.json()
         for addon in ids:
@@ -554,24 +779,61 @@ class Core:
         return node_id, self.http.get(url, headers={'Accept': 'application/octet-stream'},
                                       auth=APIAuth('Bearer', self.config['GHAPIKey'])).json()
 
+    def bulk_gh_check_assets(self, release):
+        query = ('query($id: ID!, $after: String) { node(id: $id) { ... on Release { assets: releaseAssets(first: 100, '
+                 'after: $after) { pageInfo { hasNextPage endCursor } nodes { node_id: id name content_type: contentTy'
+                 'pe url } } } } }')
+        assets = release['assets']['nodes']
+        page = release['assets']['pageInfo']
+        while page['hasNextPage']:
+            payload = self.http.post('https://api.github.com/graphql',
+                                     json={'query': query, 'variables': {'id': release['node_id'],
+                                                                         'after': page['endCursor']}},
+                                     auth=APIAuth('Bearer', self.config['GHAPIKey']), timeout=15)
+            if payload.status_code != 200 or not (node := (payload.json().get('data') or {}).get('node')):
+                return None
+            assets.extend(node['assets']['nodes'])
+            page = node['assets']['pageInfo']
+        return assets
+
+    def bulk_gh_check_chunk(self, ids):
+        query = ('query($query: String!, $after: String) { search(type: REPOSITORY, query: $query, first: 25, after'
+                 ': $after) { pageInfo { hasNextPage endCursor } nodes { ... on Repository { nameWithOwner releases(fi'
+                 'rst: 15) { nodes { node_id: id tag_name: tagName name html_url: url draft: isDraft prerelease: isPre'
+                 'release assets: releaseAssets(first: 100) { pageInfo { hasNextPage endCursor } nodes { node_id: id n'
+                 'ame content_type: contentType url } } } } } } } }')
+        variables = {'query': f'repo:{" repo:".join(ids)} fork:true', 'after': None}
+        output = {}
+        while True:
+            payload = self.http.post('https://api.github.com/graphql', json={'query': query, 'variables': variables},
+                                     auth=APIAuth('Bearer', self.config['GHAPIKey']), timeout=15)
+            if payload.status_code != 200:
+                break
+            payload = payload.json()
+            if not (payload.get('data') or {}).get('search'):
+                break
+            for addon in payload['data']['search']['nodes']:
+                if addon:
+                    releases = [{**release, 'assets': self.bulk_gh_check_assets(release)}
+                                for release in addon['releases']['nodes']]
+                    if all(release['assets'] is not None for release in releases):
+                        output[addon['nameWithOwner']] = releases
+            if not payload['data']['search']['pageInfo']['hasNextPage']:
+                break
+            variables['after'] = payload['data']['search']['pageInfo']['endCursor']
+        return output
+
     def bulk_gh_check(self, ids):
-        query = ('{\n  "query": "{ search( type: REPOSITORY query: \\"' + f'repo:{" repo:".join(ids)}' + ' fork:true\\"'
-                 ' first: 100 ) { nodes { ... on Repository { nameWithOwner releases(first: 15) { nodes { tag_name: tag'
-                 'Name name html_url: url draft: isDraft prerelease: isPrerelease assets: releaseAssets(first: 100) { n'
-                 'odes { node_id: id name content_type: contentType url } } } } } } }}"\n'
-                 '}')
-        payload = self.http.post('https://api.github.com/graphql', json=json.loads(query),
-                                 auth=APIAuth('Bearer', self.config['GHAPIKey']), timeout=15)
-        if payload.status_code != 200:
-            return
-        payload = payload.json()
+        releases = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            workers = [executor.submit(self.bulk_gh_check_chunk, ids[i:i + 25]) for i in range(0, len(ids), 25)]
+            for future in workers:
+                with suppress(httpx.RequestError, json.JSONDecodeError):
+                    releases.update(future.result())
+        self.githubCache.update(releases)
         packager_cache = {}
-        for addon in payload['data']['search']['nodes']:
-            self.githubCache[addon['nameWithOwner']] = addon['releases']['nodes']
-        for addon in self.githubCache:
-            for i in range(len(self.githubCache[addon])):
-                self.githubCache[addon][i]['assets'] = self.githubCache[addon][i]['assets']['nodes']
-            for release in self.githubCache[addon]:
+        for addon in releases.values():
+            for release in addon:
                 if not release['draft'] and not release['prerelease']:
                     for asset in release['assets']:
                         if asset['name'] == 'release.json':
@@ -593,7 +855,7 @@ class Core:
     @retry(custom_error='Failed to parse Tukui API data')
     def bulk_tukui_check(self):
         if not self.tukuiCache:
-            self.tukuiCache = self.http.get('https://api.tukui.org/v1/addons').json()
+            self.tukuiCache = self.httpCache.get(self.http, 'https://api.tukui.org/v1/addons').json()
 
     def detect_accounts(self):
         if not os.path.isdir(Path('WTF/Account')):
@@ -0,0 +1,51 @@
+import httpx
+import asyncio
+import threading
+import concurrent.futures
+from . import __version__
+
+
+class AsyncEngine:
+    def __init__(self, metadata=8, downloads=8, installs=2):
+        self.http = httpx.AsyncClient(headers={'User-Agent': f'CurseBreaker/{__version__}'}, timeout=10, http2=True,
+                                      follow_redirects=True)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.metadataLimit = asyncio.Semaphore(metadata)
+        self.downloadLimit = asyncio.Semaphore(downloads)
+        self.installExecutor = concurrent.futures.ThreadPoolExecutor(max_workers=installs)
+        self.waiters = {}
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self.run(self.shutdown())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.installExecutor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine):
+        return self.submit(coroutine).result()
+
+    async def shutdown(self):
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.http.aclose()
+
+    async def install(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.installExecutor, func, *args)
+
+    async def wait(self, event):
+        if event.is_set():
+            return
+        if event not in self.waiters:
+            self.waiters[event] = asyncio.ensure_future(asyncio.to_thread(event.wait))
+        await asyncio.shield(self.waiters[event])
@@ -1,46 +1,65 @@
 import os
-import io
 import httpx
 import shutil
 import zipfile
-from . import retry, APIAuth
+from . import retry, retry_async, download, extract, APIAuth, AsyncAddon
+
+
+class MetadataRequired(Exception):
+    pass
 
 
 class GitHubAddon:
     @retry()
-    def __init__(self, url, checkcache, packagercache, clienttype, apikey, http):
+    def __init__(self, url, checkcache, packagercache, clienttype, apikey, http, cache, httpcache):
+        self.setup(url, checkcache, packagercache, clienttype, apikey, http, cache, httpcache)
+        if self.payload is None:
+            try:
+                self.load_payload(self.httpCache.get(self.http, **self.get_payload_request()))
+            except httpx.RequestError as e:
+                raise RuntimeError(self.get_payload_error()) from e
+        self.parse_payload()
+
+    def setup(self, url, checkcache, packagercache, clienttype, apikey, http, cache, httpcache):
         project = url.replace('https://github.com/', '')
+        self.url = url
+        self.project = project
         self.http = http
+        self.cache = cache
+        self.httpCache = httpcache
         self.apiKey = apikey
-        self.payloads = []
+        self.clientType = clienttype
         self.packagerCache = packagercache
-        if project in checkcache:
-            self.payload = checkcache[project]
+        self.payload = checkcache[project] if project in checkcache else None
+
+    def get_payload_request(self):
+        return {'url': f'https://api.github.com/repos/{self.project}/releases', 'auth': APIAuth('Bearer', self.apiKey)}
+
+    def get_payload_error(self):
+        return f'{self.project}\nGitHub API failed to respond.'
+
+    def load_payload(self, response):
+        if response.status_code == 401:
+            raise RuntimeError(f'{self.project}\nIncorrect or expired GitHub API personal access token.')
+        elif response.status_code == 403:
+            raise RuntimeError(f'{self.project}\nGitHub API rate limit exceeded. Try later or provide personal access '
+                               f'token.')
+        elif response.status_code == 404:
+            raise RuntimeError(self.url)
         else:
-            try:
-                self.payload = self.http.get(f'https://api.github.com/repos/{project}/releases',
-                                             auth=APIAuth('Bearer', self.apiKey))
-            except httpx.RequestError as e:
-                raise RuntimeError(f'{project}\nGitHub API failed to respond.') from e
-            if self.payload.status_code == 401:
-                raise RuntimeError(f'{project}\nIncorrect or expired GitHub API personal access token.')
-            elif self.payload.status_code == 403:
-                raise RuntimeError(f'{project}\nGitHub API rate limit exceeded. Try later or provide personal access '
-                                   f'token.')
-            elif self.payload.status_code == 404:
-                raise RuntimeError(url)
-            else:
-                self.payload = self.payload.json()
+            self.payload = response.json()
+
+    def parse_payload(self):
+        self.payloads = []
         for release in self.payload:
             if release['assets'] and len(release['assets']) > 0 and not release['draft'] and not release['prerelease']:
                 self.payloads.append(release)
                 if len(self.payloads) > 14:
                     break
         if not self.payloads:
-            raise RuntimeError(f'{url}\nThis integration supports only the projects that provide packaged'
+            raise RuntimeError(f'{self.url}\nThis integration supports only the projects that provide packaged'
                                f' releases.')
-        self.name = project.split('/')[1]
-        self.clientType = clienttype
+        self.name = self.project.split('/')[1]
         self.currentVersion = None
         self.uiVersion = None
         self.downloadUrl = None
@@ -48,7 +67,7 @@ class GitHubAddon:
         self.archive = None
         self.metadata = None
         self.directories = []
-        self.author = [project.split('/')[0]]
+        self.author = [self.project.split('/')[0]]
         self.releaseDepth = 0
         self.parse()
 
@@ -63,15 +82,22 @@ class GitHubAddon:
         else:
             self.get_latest_package_nometa()
 
-    def parse_metadata(self):
+    def get_metadata_asset(self):
         for release in self.payloads[self.releaseDepth]['assets']:
             if release['name'] and release['name'] == 'release.json':
-                if release['node_id'] in self.packagerCache:
-                    self.metadata = self.packagerCache[release['node_id']]
-                else:
-                    self.metadata = self.http.get(release['url'], headers={'Accept': 'application/octet-stream'},
-                                                  auth=APIAuth('Bearer', self.apiKey)).json()
-                break
+                return release
+        return None
+
+    def get_metadata_request(self, release):
+        return {'url': release['url'], 'headers': {'Accept': 'application/octet-stream'},
+                'auth': APIAuth('Bearer', self.apiKey)}
+
+    def parse_metadata(self):
+        if release := self.get_metadata_asset():
+            if release['node_id'] in self.packagerCache:
+                self.metadata = self.packagerCache[release['node_id']]
+            else:
+                self.metadata = self.http.get(**self.get_metadata_request(release)).json()
         else:
             self.metadata = None
 
@@ -131,11 +157,19 @@ class GitHubAddon:
             self.releaseDepth += 1
             self.parse()
 
+    def get_cache_key(self):
+        return self.cache.get_key('GitHub', self.project, self.currentVersion, self.downloadUrl) if self.cache else None
+
+    def get_download(self):
+        return {'url': self.downloadUrl, 'cache': self.cache, 'key': self.get_cache_key(),
+                'headers': {'Accept': 'application/octet-stream'}, 'auth': APIAuth('Bearer', self.apiKey)}
+
     @retry()
     def get_addon(self):
-        self.archive = zipfile.ZipFile(io.BytesIO(
-            self.http.get(self.downloadUrl, headers={'Accept': 'application/octet-stream'},
-                          auth=APIAuth('Bearer', self.apiKey)).content))
+        self.load_archive(download(self.http, **self.get_download()))
+
+    def load_archive(self, payload):
+        self.archive = zipfile.ZipFile(payload)
         for file in self.archive.namelist():
             if file.lower().endswith('.toc') and '/' not in file:
                 raise RuntimeError(f'{self.name}.\nProject package is corrupted or incorrectly packaged.')
@@ -146,52 +180,111 @@ class GitHubAddon:
             raise RuntimeError(f'{self.name}.\nProject package is corrupted or incorrectly packaged.')
 
     def install(self, path):
-        self.archive.extractall(path)
+        return extract(self.archive, path)
 
 
 class GitHubAddonRaw:
     @retry()
-    def __init__(self, addon, apikey, http):
-        repository = addon['Repository']
+    def __init__(self, addon, apikey, http, cache):
+        self.setup(addon, apikey, http, cache)
+        try:
+            self.load_payload(self.http.get(**self.get_payload_request()))
+        except httpx.RequestError as e:
+            raise RuntimeError(self.get_payload_error()) from e
+        self.parse_payload()
+
+    def setup(self, addon, apikey, http, cache):
+        self.addon = addon
+        self.repository = addon['Repository']
         self.http = http
+        self.cache = cache
         self.apiKey = apikey
         self.branch = addon['Branch']
         self.name = addon['Name']
-        try:
-            self.payload = self.http.get(f'https://api.github.com/repos/{repository}/branches/{self.branch}',
-                                         auth=APIAuth('Bearer', self.apiKey))
-        except httpx.RequestError as e:
-            raise RuntimeError(f'{self.name}\nGitHub API failed to respond.') from e
-        if self.payload.status_code == 401:
+        self.payload = None
+
+    def get_payload_request(self):
+        return {'url': f'https://api.github.com/repos/{self.repository}/branches/{self.branch}',
+                'auth': APIAuth('Bearer', self.apiKey)}
+
+    def get_payload_error(self):
+        return f'{self.name}\nGitHub API failed to respond.'
+
+    def load_payload(self, response):
+        if response.status_code == 401:
             raise RuntimeError(f'{self.name}\nIncorrect or expired GitHub API personal access token.')
-        elif self.payload.status_code == 403:
+        elif response.status_code == 403:
             raise RuntimeError(f'{self.name}\nGitHub API rate limit exceeded. Try later or provide personal access '
                                f'token.')
-        elif self.payload.status_code == 404:
+        elif response.status_code == 404:
             raise RuntimeError(f'{self.name}\nTarget branch don\'t exist.')
         else:
-            self.payload = self.payload.json()
-        self.shorthPath = repository.split('/')[1]
+            self.payload = response.json()
+
+    def parse_payload(self):
+        self.shorthPath = self.repository.split('/')[1]
         if self.name in ['ElvUI', 'Tukui']:
             self.downloadUrl = f'https://api.tukui.org/v1/download/dev/{self.name.lower()}/{self.branch}'
         else:
-            self.downloadUrl = f'https://github.com/{repository}/archive/refs/heads/{self.branch}.zip'
+            self.downloadUrl = f'https://github.com/{self.repository}/archive/refs/heads/{self.branch}.zip'
 
-        self.changelogUrl = f'https://github.com/{repository}/commits/{self.branch}'
+        self.changelogUrl = f'https://github.com/{self.repository}/commits/{self.branch}'
         self.currentVersion = self.payload['commit']['sha'][:7]
         self.uiVersion = None
         self.archive = None
-        self.directories = addon['Directories']
-        self.author = addon['Authors']
+        self.directories = self.addon['Directories']
+        self.author = self.addon['Authors']
+
+    def get_cache_key(self):
+        return self.cache.get_key('GitHub', self.repository, self.currentVersion, self.downloadUrl) \
+            if self.cache else None
+
+    def get_download(self):
+        return {'url': self.downloadUrl, 'cache': self.cache, 'key': self.get_cache_key()}
 
     @retry()
     def get_addon(self):
-        self.archive = zipfile.ZipFile(io.BytesIO(self.http.get(self.downloadUrl).content))
+        self.load_archive(download(self.http, **self.get_download()))
+
+    def load_archive(self, payload):
+        self.archive = zipfile.ZipFile(payload)
 
     def install(self, path):
         for directory in self.directories:
             shutil.rmtree(path / directory, ignore_errors=True)
+        members = []
         for file in self.archive.infolist():
             file.filename = file.filename.replace(f'{self.shorthPath}-{self.branch}/', '')
             if any(f in file.filename for f in self.directories):
-                self.archive.extract(file, path)
+                members.append(file)
+        return extract(self.archive, path, members)
+
+
+class AsyncGitHubAddon(AsyncAddon, GitHubAddon):
+    def __init__(self, url, checkcache, packagercache, clienttype, apikey, http, cache, httpcache):
+        self.setup(url, checkcache, packagercache, clienttype, apikey, http, cache, httpcache)
+
+    def parse_metadata(self):
+        if (release := self.get_metadata_asset()) and release['node_id'] not in self.packagerCache:
+            raise MetadataRequired(release)
+        super().parse_metadata()
+
+    @retry_async()
+    async def get_metadata(self):
+        if self.payload is None:
+            try:
+                self.load_payload(await self.httpCache.get_async(self.http, **self.get_payload_request()))
+            except httpx.RequestError as e:
+                raise RuntimeError(self.get_payload_error()) from e
+        while True:
+            try:
+                return self.parse_payload()
+            except MetadataRequired as e:
+                release = e.args[0]
+                self.packagerCache[release['node_id']] = (await self.http.get(
+                    **self.get_metadata_request(release))).json()
+
+
+class AsyncGitHubAddonRaw(AsyncAddon, GitHubAddonRaw):
+    def __init__(self, addon, apikey, http, cache):
+        self.setup(addon, apikey, http, cache)
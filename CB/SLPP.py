@@ -38,6 +38,28 @@ WHITESPACE_OR_CLOSING_SQ_BR = WHITESPACE | frozenset(']')
 NEWLINE = frozenset('\r\n')
 
 match_bare_word = re.compile(r'^[a-z_]\w*$', flags=re.IGNORECASE)
+match_word = re.compile(r'[a-z_]\w*', flags=re.IGNORECASE).match
+match_whitespace = re.compile(r'[ \t\n\r\x0b\x0c]*').match
+match_whitespace_or_closing_sq_br = re.compile(r'[ \t\n\r\x0b\x0c\]]*').match
+match_opening_sq_br = re.compile(r'\[*').match
+match_closing_sq_br = re.compile(r'\]*').match
+match_digits = re.compile(r'[0-9]*').match
+match_hexdigits = re.compile(r'[0-9a-fA-F]*').match
+match_quoted = {q: re.compile(rf'[^{q}\\]*(?:\\.[^{q}\\]*)*', flags=re.DOTALL).match for q in '\'"'}
+search_newline = re.compile(r'[\r\n]').search
+# Shortcuts for the shapes SavedVariables are written in, anything else goes through the generic path
+_WS = r'[ \t\n\r\x0b\x0c]'
+_STRING = r'"([^"\\]*)"'
+_INT = r'(-?(?:[1-9][0-9]*|0))(?![0-9.eExX])'
+_FLOAT = r'(-?[0-9]+\.[0-9]*)(?![0-9eE])'
+match_scalar = re.compile(rf'{_WS}*(?:{_STRING}|{_INT}|{_FLOAT}|(true|false),)').match
+# Groups: key (1-2), value of the key (3-6), key-less value (7-10), none for a comment
+match_entry = re.compile(
+    rf'{_WS}*(?:\[(?:{_STRING}|{_INT})[ \t\n\r\x0b\x0c\]]*='
+    rf'(?:{_WS}*(?:{_STRING}|{_INT}|{_FLOAT}|(true|false),)(?:{_WS}*,)?)?'
+    rf'|(?:(?:{_STRING}|{_INT}|{_FLOAT})[ \t\n\r\x0b\x0c\]]*,|(true|false),(?={_WS}*[^\]=, \t\n\r\x0b\x0c]))'
+    rf'|--[^\r\n]*[\r\n]{_WS}*(?=[^\]= \t\n\r\x0b\x0c]))'
+).match
 
 
 class ParseError(Exception):
@@ -51,6 +73,25 @@ class _Sentinel(str):
 _sentinel = _Sentinel()
 
 
+def _is_list(table: dict[Any, Any]) -> bool:
+    # Convert table to list if k(0) = 1 and k = k(n-1) + 1, ...
+    return bool(
+        table
+        and all(map(eq, table, count(1)))
+        # bool is a subclass of int in Python but not in Lua
+        and not any(isinstance(k, bool) for k in islice(table, 0, 2))
+    )
+
+
+def _select(spec: dict[Any, Any] | None, key: Any) -> dict[Any, Any] | None:
+    # None selects the whole value, an empty spec selects nothing
+    if spec is None:
+        return None
+    elif key in spec:
+        return spec[key]
+    return spec.get('*', {})
+
+
 class _SLPP:
     def __init__(self, text: str):
         self._iter_text = iter(text)
@@ -86,17 +127,8 @@ class _SLPP:
             self._next_not_eq(WHITESPACE)
 
             if self.c == '}':
-                # Convert table to list if k(0) = 1 and k = k(n-1) + 1, ...
-                if (
-                    table
-                    and all(map(eq, table, count(1)))
-                    # bool is a subclass of int in Python but not in Lua
-                    and not any(isinstance(k, bool) for k in islice(table, 0, 2))
-                ):
-                    table = list(table.values())
-
                 self._next()
-                return table
+                return list(table.values()) if _is_list(table) else table
 
             elif self.c == ',':
                 self._next()
@@ -263,5 +295,205 @@ class _SLPP:
             return self._decode_bare_word()
 
 
-def loads(s: str) -> Any:
-    return _SLPP(s).decode()
+def _scalar(match: re.Match[str], index: int) -> Any:
+    # Index relative to the string, integer, float and boolean groups of a shortcut
+    value = match.group(match.lastindex)
+    if index == 1:
+        return value
+    elif index == 2:
+        return int(value)
+    elif index == 3:
+        return float(value)
+    return value == 'true'
+
+
+class _FastSLPP:
+    # Same grammar as _SLPP but tokens are sliced out of the source instead of being built one character at a time
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+        self.pos = 0
+
+    def _decode_table(self, spec=None):
+        text = self.text
+        table: dict[Any, Any] = {}
+        idx = 0
+
+        self.pos += 1
+        while True:
+            if match := match_entry(text, self.pos):
+                self.pos = match.end()
+                index = match.lastindex
+                if index is None:
+                    continue
+                elif index >= 7:
+                    idx += 1
+                    table[idx] = _scalar(match, index - 6)
+                    continue
+
+                item = match.group(1) if match.group(2) is None else int(match.group(2))
+                value = _scalar(match, index - 2) if index >= 3 else self.decode(_select(spec, item))
+                if value is not None and (not isinstance(item, int) or item > idx):
+                    table[item] = value
+                continue
+
+            self.pos = match_whitespace(text, self.pos).end()
+            c = text[self.pos:self.pos + 1]
+
+            if c == '}':
+                self.pos += 1
+                is_list = _is_list(table)
+                if spec is not None and '*' not in spec:
+                    # Entries that weren't selected still count for the list conversion
+                    table = {k: v for k, v in table.items() if k in spec}
+                return list(table.values()) if is_list else table
+
+            elif c == ',':
+                self.pos += 1
+
+            else:
+                is_val_long_string_literal = False
+
+                if c == '[':
+                    self.pos += 1
+                    if text[self.pos:self.pos + 1] == '[':
+                        is_val_long_string_literal = True
+
+                item = self.decode(_select(spec, idx + 1))
+                self.pos = match_whitespace_or_closing_sq_br(text, self.pos).end()
+
+                c = text[self.pos:self.pos + 1]
+                if c and c in '=,':
+                    self.pos += 1
+
+                    if c == '=':
+                        if is_val_long_string_literal:
+                            raise ParseError('malformed key', item)
+
+                        if item is None:
+                            raise ParseError('table keys cannot be nil')
+
+                        value = self.decode(_select(spec, item))
+                        if value is not None and (not isinstance(item, int) or isinstance(item, bool) or item > idx):
+                            table[item] = value
+                        continue
+
+                if item is not None:
+                    idx += 1
+                    table[idx] = item
+
+    def _decode_string(self):
+        text = self.text
+        start = text[self.pos]
+
+        if start == '[':
+            # Content starts after the opening brackets and ends at the first closing one
+            begin = match_opening_sq_br(text, self.pos).end()
+            end = text.find(']', begin + 1)
+            if end == -1:
+                self.pos = self.length
+                return text[begin:]
+            self.pos = match_closing_sq_br(text, end + 1).end()
+            return text[begin:end]
+
+        match = match_quoted[start](text, self.pos + 1)
+        s = match.group()
+        if '\\' in s:
+            s = s.replace('\\' + start, start)
+        self.pos = min(match.end() + 1, self.length)
+        return s
+
+    def _decode_bare_word(self):
+        text = self.text
+        match = match_word(text, self.pos)
+        end = match.end() if match else self.pos + 1
+        # _SLPP matches with $ which also accepts a trailing newline
+        if match and text[end:end + 1] == '\n':
+            end += 1
+        s = text[self.pos:end]
+
+        # The character terminating the word is consumed
+        self.pos = min(end + 1, self.length)
+
+        if s == 'true':
+            return True
+        elif s == 'false':
+            return False
+        elif s == 'nil':
+            return None
+        return s
+
+    def _decode_number(self):
+        text = self.text
+        pos = self.pos
+        n = ''
+
+        if text[pos] == '-':
+            pos += 1
+            c = text[pos:pos + 1]
+            if c == '-':
+                # This is a comment - skip to the end of the line
+                match = search_newline(text, pos + 1)
+                self.pos = match.start() if match else self.length
+                return None
+
+            elif not c or c not in DIGITS:
+                raise ParseError('malformed number (no digits after minus sign)', '-' + c)
+
+            n = '-'
+
+        end = match_digits(text, pos + 1).end()
+        n += text[pos:end]
+        pos = end
+        c = text[pos:pos + 1]
+        if n == '0' and c in HEXDELIMS:
+            end = match_hexdigits(text, pos + 1).end()
+            n += text[pos:end]
+            pos = end
+
+        else:
+            if c == '.':
+                end = match_digits(text, pos + 1).end()
+                n += text[pos:end]
+                pos = end
+                c = text[pos:pos + 1]
+
+            if c in EXPONENTS:
+                # Sign is taken as is
+                end = match_digits(text, min(pos + 2, self.length)).end()
+                n += text[pos:end]
+                pos = end
+
+        self.pos = pos
+        try:
+            return int(n, 0)
+        except ValueError:
+            return float(n)
+
+    def decode(self, spec=None):
+        if match := match_scalar(self.text, self.pos):
+            self.pos = match.end()
+            return _scalar(match, match.lastindex)
+
+        self.pos = match_whitespace(self.text, self.pos).end()
+        c = self.text[self.pos:self.pos + 1]
+        if not c:
+            raise ParseError('input is empty')
+        elif c == '{':
+            return self._decode_table(spec)
+        elif c in '\'"[':
+            return self._decode_string()
+        elif c == '-' or c in DIGITS:
+            return self._decode_number()
+        else:
+            return self._decode_bare_word()
+
+
+def loads(s: str, legacy: bool = False) -> Any:
+    return (_SLPP if legacy else _FastSLPP)(s).decode()
+
+
+def extract(s: str, spec: dict[Any, Any]) -> Any:
+    # Only the tables selected by spec are kept, e.g. {'displays': {'*': {'url': None}}}
+    # '*' matches any key and None keeps the whole value
+    return _FastSLPP(s).decode(spec)
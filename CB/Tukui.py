@@ -1,31 +1,48 @@
 import os
-import io
 import zipfile
-from . import retry
+from . import retry, download, extract, AsyncAddon
 
 
 class TukuiAddon:
     @retry()
-    def __init__(self, slug, checkcache, clientversion, http):
+    def __init__(self, slug, checkcache, clientversion, http, cache):
+        self.setup(slug, checkcache, clientversion, http, cache)
+        self.parse_payload()
+
+    def setup(self, slug, checkcache, clientversion, http, cache):
         for addon in checkcache:
             if addon['slug'] == slug:
                 self.payload = addon
                 break
         else:
             raise RuntimeError(f'{slug}\nProject not found.')
+        self.slug = slug
         self.http = http
+        self.cache = cache
+        self.clientVersion = clientversion
+
+    def parse_payload(self):
         self.name = self.payload['name'].strip().strip('\u200b')
         self.downloadUrl = self.payload['url']
         self.currentVersion = self.payload['version']
-        self.uiVersion = clientversion if clientversion in self.payload['patch'] else self.payload['patch'][0]
+        self.uiVersion = self.clientVersion if self.clientVersion in self.payload['patch'] else self.payload['patch'][0]
         self.archive = None
         self.directories = self.payload['directories']
         self.author = [self.payload['author']]
         self.changelogUrl = self.payload['changelog_url']
 
+    def get_cache_key(self):
+        return self.cache.get_key('Tukui', self.slug, self.currentVersion, self.downloadUrl) if self.cache else None
+
+    def get_download(self):
+        return {'url': self.downloadUrl, 'cache': self.cache, 'key': self.get_cache_key()}
+
     @retry()
     def get_addon(self):
-        self.archive = zipfile.ZipFile(io.BytesIO(self.http.get(self.downloadUrl).content))
+        self.load_archive(download(self.http, **self.get_download()))
+
+    def load_archive(self, payload):
+        self.archive = zipfile.ZipFile(payload)
         for file in self.archive.namelist():
             if '/' not in os.path.dirname(file):
                 self.directories.append(os.path.dirname(file))
@@ -34,4 +51,10 @@ class TukuiAddon:
             raise RuntimeError(f'{self.name}.\nProject package is corrupted or incorrectly packaged.')
 
     def install(self, path):
-        self.archive.extractall(path)
+        return extract(self.archive, path)
+
+
+class AsyncTukuiAddon(AsyncAddon, TukuiAddon):
+    @retry()
+    def __init__(self, slug, checkcache, clientversion, http, cache):
+        self.setup(slug, checkcache, clientversion, http, cache)
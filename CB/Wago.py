@@ -3,13 +3,20 @@ import re
 import httpx
 import shutil
 import bbcode
-from io import StringIO, BytesIO
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+import concurrent.futures
+from io import StringIO
 from pathlib import Path
 from zipfile import ZipFile
 from markdown import Markdown
 from urllib.parse import quote_plus
-from . import retry
-from .SLPP import loads
+from . import retry, download
+from .SLPP import extract
+from .Checksum import ALGORITHM, hash_file
+from .Cache import EncodedStringCache, SavedVariablesCache
 
 
 def markdown_unmark_element(element, stream=None):
@@ -34,26 +41,44 @@ class WagoAPIAuth(httpx.Auth):
         yield request
 
 
+def parse_storage(parser):
+    parser.parse_storage()
+    return parser.list, parser.ignored
+
+
 class BaseParser:
     def __init__(self):
         self.urlParser = re.compile('/([a-zA-Z0-9_-]+)/(\\d+)')
+        self.fields = {'url': None, 'ignoreWagoUpdate': None, 'skipWagoUpdate': None}
+        self.path = None
+        self.cache = None
         self.list = {}
         self.ignored = {}
         self.data = {'slugs': [], 'stash': []}
 
+    def load_cache(self):
+        if self.cache and (cached := self.cache.get(self.path)) is not None:
+            self.list, self.ignored = cached['List'], cached['Ignored']
+            return True
+        return False
+
+    def save_cache(self):
+        if self.cache:
+            self.cache.put(self.path, {'List': self.list, 'Ignored': self.ignored})
+
 
 class WeakAuraParser(BaseParser):
-    def __init__(self, accountname):
+    def __init__(self, accountname, cache=None):
         super().__init__()
         self.accountName = accountname
+        self.path = Path(f'WTF/Account/{accountname}/SavedVariables/WeakAuras.lua')
+        self.cache = cache
         self.api = 'weakauras'
-        self.parse_storage()
 
     def parse_storage(self):
-        with open(Path(f'WTF/Account/{self.accountName}/SavedVariables/WeakAuras.lua'), encoding='utf-8',
-                  errors='ignore') as file:
+        with open(self.path, encoding='utf-8', errors='ignore') as file:
             data = file.read().replace('WeakAurasSaved = {', '{')
-        wadata = loads(data)
+        wadata = extract(data, {'displays': {'*': self.fields}})
         for wa in wadata['displays']:
             if 'url' in wadata['displays'][wa]:
                 search = self.urlParser.search(wadata['displays'][wa]['url'])
@@ -65,11 +90,12 @@ class WeakAuraParser(BaseParser):
 
 
 class PlaterParser(BaseParser):
-    def __init__(self, accountname):
+    def __init__(self, accountname, cache=None):
         super().__init__()
         self.accountName = accountname
+        self.path = Path(f'WTF/Account/{accountname}/SavedVariables/Plater.lua')
+        self.cache = cache
         self.api = 'plater'
-        self.parse_storage()
 
     def parse_storage_internal(self, data):
         for script in data:
@@ -81,10 +107,12 @@ class PlaterParser(BaseParser):
                     self.list[search.group(1)] = int(search.group(2))
 
     def parse_storage(self):
-        with open(Path(f'WTF/Account/{self.accountName}/SavedVariables/Plater.lua'), encoding='utf-8',
-                  errors='ignore') as file:
+        with open(self.path, encoding='utf-8', errors='ignore') as file:
             data = file.read()
-        platerdata = loads(re.search(r'PlaterDB = {\n.*?}\n', data, re.DOTALL).group().replace('PlaterDB = {', '{', 1))
+        data = re.search(r'PlaterDB = {\n.*?}\n', data, re.DOTALL).group().replace('PlaterDB = {', '{', 1)
+        platerdata = extract(data, {'profiles': {'*': {'script_data': {'*': self.fields},
+                                                       'hook_data': {'*': self.fields},
+                                                       **self.fields}}})
         for profile in platerdata['profiles']:
             if data := platerdata['profiles'][profile]['script_data']:
                 self.parse_storage_internal(data)
@@ -101,12 +129,16 @@ class PlaterParser(BaseParser):
 
 class WagoUpdater:
     # noinspection PyTypeChecker
-    def __init__(self, config, http):
+    def __init__(self, config, http, accounts=None):
         self.http = http
         self.auth = WagoAPIAuth(config['WAAPIKey'])
         self.username = config['WAUsername']
         self.accountName = config['WAAccountName']
+        self.accounts = [self.accountName] if self.accountName else (accounts or [])
         self.stash = config['WAStash']
+        self.storageCache = SavedVariablesCache(Path('WTF/CurseBreaker/SavedVariables.json'))
+        self.encodedCache = EncodedStringCache(Path('WTF/CurseBreaker/Wago'))
+        self.hostLimit = threading.Semaphore(8)
         self.bbParser = bbcode.Parser()
         Markdown.output_formats['plain'] = markdown_unmark_element
         self.mdParser = Markdown(output_format='plain')
@@ -125,6 +157,7 @@ class WagoUpdater:
                                      json={'ids': list(addon.list.keys())}, auth=self.auth, timeout=15).json()
             if 'error' in payload or 'msg' in payload:
                 raise RuntimeError
+            outdated = []
             for entry in payload:
                 if 'username' in entry and (not self.username or entry['username'] != self.username):
                     if entry['slug'] not in addon.list:
@@ -132,9 +165,11 @@ class WagoUpdater:
                     if (entry['version'] > addon.list[entry['slug']] and
                             (entry['slug'] not in addon.ignored or entry['version'] != addon.ignored[entry['slug']])):
                         output[0].append([entry['name'], entry['url']])
-                        self.update_entry(entry, addon)
+                        outdated.append(entry)
                     elif 'name' in entry:
                         output[1].append([entry['name'], entry['url']])
+            for entry, raw in zip(outdated, self.get_raws(outdated), strict=True):
+                self.update_entry(entry, raw, addon)
             output[0] = sorted(output[0], key=lambda v: v[0])
             output[1] = sorted(output[1], key=lambda v: v[0])
         return output
@@ -145,10 +180,8 @@ class WagoUpdater:
         if len(self.stash) > 0:
             payload = self.http.post('https://data.wago.io/api/check/',
                                      json={'ids': self.stash}, auth=self.auth, timeout=15).json()
-            for entry in payload:
+            for entry, raw in zip(payload, self.get_raws(payload), strict=True):
                 output.append(entry['name'])
-                raw = self.http.get(f'https://data.wago.io/api/raw/encoded?id={quote_plus(entry["slug"])}',
-                                    auth=self.auth, timeout=15).text
                 stash = f'        ["{entry["slug"]}"] = {{\n          name = [=[{entry["name"]}]=],\n          author' \
                         f' = [=[{entry["username"]}]=],\n          encoded = [=[{raw}]=],\n          wagoVersion = [=' \
                         f'[{entry["version"]}]=],\n          wagoSemver = [=[{entry["versionString"]}]=],\n          ' \
@@ -171,9 +204,21 @@ class WagoUpdater:
             return self.mdParser.convert(entry['changelog']['text'])
 
     @retry('Failed to parse Wago data. Wago might be down or provided API key is incorrect.')
-    def update_entry(self, entry, addon):
-        raw = self.http.get(f'https://data.wago.io/api/raw/encoded?id={quote_plus(entry["slug"])}',
-                            auth=self.auth, timeout=15).text
+    def get_raw(self, entry):
+        if (raw := self.encodedCache.get(entry['slug'], entry['version'])) is None:
+            with self.hostLimit:
+                payload = self.http.get(f'https://data.wago.io/api/raw/encoded?id={quote_plus(entry["slug"])}',
+                                        auth=self.auth, timeout=15)
+            payload.raise_for_status()
+            raw = payload.text
+            self.encodedCache.put(entry['slug'], entry['version'], raw)
+        return raw
+
+    def get_raws(self, entries):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            return list(executor.map(self.get_raw, entries))
+
+    def update_entry(self, entry, raw, addon):
         slug = f'        ["{entry["slug"]}"] = {{\n          name = [=[{entry["name"]}]=],\n          author = [=[' \
                f'{entry["username"]}]=],\n          encoded = [=[{raw}]=],\n          wagoVersion = [=[' \
                f'{entry["version"]}]=],\n          wagoSemver = [=[{entry["versionString"]}]=],\n          source = [' \
@@ -182,47 +227,84 @@ class WagoUpdater:
                f'        }},\n'
         addon.data['slugs'].append(slug)
 
+    def get_data(self, wadata, platerdata):
+        yield 'CurseBreakerCompanion = {\n  WeakAuras = {\n    slugs = {\n'
+        yield from wadata['slugs']
+        yield '    },\n    stash = {\n'
+        yield from wadata['stash']
+        yield '    },\n  },\n  Plater = {\n    slugs = {\n'
+        yield from platerdata['slugs']
+        yield '    },\n    stash = {\n'
+        yield from platerdata['stash']
+        yield '    },\n  },\n}'
+
     def install_data(self, wadata, platerdata):
-        with open(Path('Interface/AddOns/CurseBreakerCompanion/Data.lua'), 'w', newline='\n', encoding='utf-8') as out:
-            out.write('CurseBreakerCompanion = {\n'
-                      '  WeakAuras = {\n'
-                      '    slugs = {\n'
-                      f'{"".join(str(x) for x in wadata["slugs"])}'
-                      '    },\n'
-                      '    stash = {\n'
-                      f'{"".join(str(x) for x in wadata["stash"])}'
-                      '    },\n'
-                      '  },\n'
-                      '  Plater = {\n'
-                      '    slugs = {\n'
-                      f'{"".join(str(x) for x in platerdata["slugs"])}'
-                      '    },\n'
-                      '    stash = {\n'
-                      f'{"".join(str(x) for x in platerdata["stash"])}'
-                      '    },\n'
-                      '  },\n'
-                      '}')
+        path = Path('Interface/AddOns/CurseBreakerCompanion/Data.lua')
+        hasher = hashlib.new(ALGORITHM)
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix='.tmp', delete=False) as out:
+            try:
+                for chunk in self.get_data(wadata, platerdata):
+                    chunk = chunk.encode('utf-8')
+                    hasher.update(chunk)
+                    out.write(chunk)
+            except BaseException:
+                out.close()
+                os.remove(out.name)
+                raise
+        # The client shouldn't see a modified file when nothing changed
+        if hasher.hexdigest() == hash_file(path, [ALGORITHM])[ALGORITHM]:
+            os.remove(out.name)
+        else:
+            os.replace(out.name, path)
 
     def install_companion(self, force):
         target_path = Path('Interface/AddOns/CurseBreakerCompanion')
         if not os.path.isdir(target_path) or force:
             shutil.rmtree(target_path, ignore_errors=True)
-            ZipFile(BytesIO(self.http.get('https://cursebreaker.acidweb.dev/CurseBreakerCompanion.zip')
-                            .content)).extractall(target_path / '..')
+            ZipFile(download(self.http, 'https://cursebreaker.acidweb.dev/CurseBreakerCompanion.zip'))\
+                .extractall(target_path / '..')
 
-    def update(self):
-        if os.path.isdir(Path('Interface/AddOns/WeakAuras')) and os.path.isfile(
-                Path(f'WTF/Account/{self.accountName}/SavedVariables/WeakAuras.lua')):
-            wa = WeakAuraParser(self.accountName)
-        else:
-            wa = BaseParser()
-        if os.path.isdir(Path('Interface/AddOns/Plater')) and os.path.isfile(
-                Path(f'WTF/Account/{self.accountName}/SavedVariables/Plater.lua')):
-            plater = PlaterParser(self.accountName)
+    def parse_storage(self, parsers):
+        parsers = [parser for parser in parsers if parser.path and not parser.load_cache()]
+        if len(parsers) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=min(len(parsers), os.cpu_count() or 1),
+                                                        mp_context=multiprocessing.get_context('spawn')) as executor:
+                results = list(executor.map(parse_storage, parsers))
         else:
-            plater = BaseParser()
-        statuswa = self.check_updates(wa)
-        statusplater = self.check_updates(plater)
-        statusstash = self.check_stash(wa, plater)
+            results = [parse_storage(parser) for parser in parsers]
+        for parser, (data, ignored) in zip(parsers, results, strict=True):
+            parser.list, parser.ignored = data, ignored
+            parser.save_cache()
+        self.storageCache.save()
+
+    def merge_storage(self, parsers, api):
+        merged = BaseParser()
+        merged.api = api
+        skipped = {}
+        for parser in parsers:
+            for slug, version in parser.list.items():
+                merged.list[slug] = min(version, merged.list.get(slug, version))
+                skipped.setdefault(slug, set()).add(parser.ignored.get(slug))
+        merged.ignored = {slug: versions.pop() for slug, versions in skipped.items()
+                          if len(versions) == 1 and None not in versions}
+        return merged
+
+    def update(self):
+        wa, plater = [], []
+        for account in self.accounts:
+            if os.path.isdir(Path('Interface/AddOns/WeakAuras')) and os.path.isfile(
+                    Path(f'WTF/Account/{account}/SavedVariables/WeakAuras.lua')):
+                wa.append(WeakAuraParser(account, self.storageCache))
+            if os.path.isdir(Path('Interface/AddOns/Plater')) and os.path.isfile(
+                    Path(f'WTF/Account/{account}/SavedVariables/Plater.lua')):
+                plater.append(PlaterParser(account, self.storageCache))
+        self.parse_storage(wa + plater)
+        wa, plater = self.merge_storage(wa, 'weakauras'), self.merge_storage(plater, 'plater')
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+            statuswa = executor.submit(self.check_updates, wa)
+            statusplater = executor.submit(self.check_updates, plater)
+            statusstash = executor.submit(self.check_stash, wa, plater)
+            statuswa, statusplater, statusstash = statuswa.result(), statusplater.result(), statusstash.result()
         self.install_data(wa.data, plater.data)
+        self.encodedCache.prune()
         return statuswa, statusplater, statusstash
@@ -1,54 +1,72 @@
 import os
-import io
 import httpx
 import zipfile
 from datetime import datetime
 from dateutil import parser
 from dateutil.tz import tzutc
 from json import JSONDecodeError
-from . import retry, APIAuth
+from . import retry, download, extract, APIAuth, AsyncAddon
 
 
 class WagoAddonsAddon:
     @retry()
-    def __init__(self, url, checkcache, clienttype, clientversion, allowdev, apikey, http):
+    def __init__(self, url, checkcache, clienttype, clientversion, allowdev, apikey, http, cache):
+        self.setup(url, checkcache, clienttype, clientversion, allowdev, apikey, http, cache)
+        if self.payload is None:
+            try:
+                self.load_payload(self.http.get(**self.get_payload_request()))
+            except httpx.RequestError as e:
+                raise RuntimeError(self.get_payload_error()) from e
+        self.parse_payload()
+
+    def setup(self, url, checkcache, clienttype, clientversion, allowdev, apikey, http, cache):
         project = url.replace('https://addons.wago.io/addons/', '')
+        self.url = url
+        self.project = project
         self.http = http
+        self.cache = cache
         self.apiKey = apikey
         self.clientType = clienttype
         self.clientVersion = clientversion
+        self.allowDev = allowdev
         if project in checkcache:
             self.payload = checkcache[project]
             self.payload['display_name'] = self.payload['name']
             self.payload['recent_release'] = self.payload['recent_releases']
         else:
-            if self.apiKey == '':
-                raise RuntimeError(f'{url}\nThe Wago Addons API key is missing. '
-                                   f'It can be obtained here: https://addons.wago.io/patreon')
+            self.payload = None
+
+    def get_payload_request(self):
+        if self.apiKey == '':
+            raise RuntimeError(f'{self.url}\nThe Wago Addons API key is missing. '
+                               f'It can be obtained here: https://addons.wago.io/patreon')
+        return {'url': f'https://addons.wago.io/api/external/addons/{self.project}?game_version={self.clientType}',
+                'auth': APIAuth('Bearer', self.apiKey)}
+
+    def get_payload_error(self):
+        return f'{self.url}\nWago Addons API failed to respond.'
+
+    def load_payload(self, response):
+        if response.status_code == 401:
+            raise RuntimeError(f'{self.url}\nWago Addons API key is missing or incorrect.')
+        elif response.status_code == 403:
+            raise RuntimeError(f'{self.url}\nProvided Wago Addons API key is expired. Please acquire a new one.')
+        elif response.status_code == 404:
+            raise RuntimeError(f'{self.url}\nThis might be a temporary issue with Wago Addons API or the project was '
+                               f'removed/renamed. In this case, uninstall it (and reinstall if it still exists) '
+                               f'to fix this issue.')
+        elif response.status_code == 423:
+            raise RuntimeError(f'{self.url}\nProvided Wago Addons API key is blocked. Please acquire a new one.')
+        elif response.status_code in [429, 500, 502, 504]:
+            raise RuntimeError(f'{self.url}\nTemporary Wago Addons API issue. Please try later.')
+        else:
             try:
-                self.payload = self.http.get(f'https://addons.wago.io/api/external/addons/{project}?game_version='
-                                             f'{self.clientType}', auth=APIAuth('Bearer', self.apiKey))
-            except httpx.RequestError as e:
-                raise RuntimeError(f'{url}\nWago Addons API failed to respond.') from e
-            if self.payload.status_code == 401:
-                raise RuntimeError(f'{url}\nWago Addons API key is missing or incorrect.')
-            elif self.payload.status_code == 403:
-                raise RuntimeError(f'{url}\nProvided Wago Addons API key is expired. Please acquire a new one.')
-            elif self.payload.status_code == 404:
-                raise RuntimeError(f'{url}\nThis might be a temporary issue with Wago Addons API or the project was '
-                                   f'removed/renamed. In this case, uninstall it (and reinstall if it still exists) '
-                                   f'to fix this issue.')
-            elif self.payload.status_code == 423:
-                raise RuntimeError(f'{url}\nProvided Wago Addons API key is blocked. Please acquire a new one.')
-            elif self.payload.status_code in [429, 500, 502, 504]:
-                raise RuntimeError(f'{url}\nTemporary Wago Addons API issue. Please try later.')
-            else:
-                try:
-                    self.payload = self.payload.json()
-                except (StopIteration, JSONDecodeError) as e:
-                    raise RuntimeError(f'{url}\nThis might be a temporary issue with Wago Addons API.') from e
+                self.payload = response.json()
+            except (StopIteration, JSONDecodeError) as e:
+                raise RuntimeError(f'{self.url}\nThis might be a temporary issue with Wago Addons API.') from e
+
+    def parse_payload(self):
         self.name = self.payload['display_name'].strip().strip('\u200b')
-        self.allowDev = allowdev
         self.downloadUrl = None
         self.changelogUrl = None
         self.currentVersion = None
@@ -95,10 +113,19 @@ class WagoAddonsAddon:
         self.changelogUrl = f'{self.payload["website_url"]}/versions'
         self.currentVersion = release['label']
 
+    def get_cache_key(self):
+        return self.cache.get_key('Wago', self.project, self.currentVersion, self.downloadUrl) if self.cache else None
+
+    def get_download(self):
+        return {'url': self.downloadUrl, 'cache': self.cache, 'key': self.get_cache_key(),
+                'auth': APIAuth('Bearer', self.apiKey)}
+
     @retry()
     def get_addon(self):
-        self.archive = zipfile.ZipFile(io.BytesIO(self.http.get(self.downloadUrl, auth=APIAuth('Bearer', self.apiKey))
-                                                  .content))
+        self.load_archive(download(self.http, **self.get_download()))
+
+    def load_archive(self, payload):
+        self.archive = zipfile.ZipFile(payload)
         for file in self.archive.namelist():
             if '/' not in os.path.dirname(file):
                 self.directories.append(os.path.dirname(file))
@@ -107,4 +134,9 @@ class WagoAddonsAddon:
             raise RuntimeError(f'{self.name}.\nProject package is corrupted or incorrectly packaged.')
 
     def install(self, path):
-        self.archive.extractall(path)
+        return extract(self.archive, path)
+
+
+class AsyncWagoAddonsAddon(AsyncAddon, WagoAddonsAddon):
+    def __init__(self, url, checkcache, clienttype, clientversion, allowdev, apikey, http, cache):
+        self.setup(url, checkcache, clienttype, clientversion, allowdev, apikey, http, cache)
@@ -1,40 +1,66 @@
 import os
-import io
 import re
 import httpx
 import zipfile
-from . import retry
+from . import retry, download, extract, AsyncAddon
 
 
 class WoWInterfaceAddon:
     @retry()
-    def __init__(self, url, checkcache, http):
+    def __init__(self, url, checkcache, http, cache):
+        self.setup(url, checkcache, http, cache)
+        if self.payload is None:
+            try:
+                self.load_payload(self.http.get(**self.get_payload_request()))
+            except httpx.RequestError as e:
+                raise RuntimeError(self.get_payload_error()) from e
+        self.parse_payload()
+
+    def setup(self, url, checkcache, http, cache):
         project = re.findall(r'\d+', url)[0]
+        self.url = url
+        self.project = project
         self.http = http
-        if project in checkcache:
-            self.payload = checkcache[project]
+        self.cache = cache
+        self.payload = checkcache[project] if project in checkcache else None
+
+    def get_payload_request(self):
+        return {'url': f'https://api.mmoui.com/v3/game/WOW/filedetails/{self.project}.json'}
+
+    def get_payload_error(self):
+        return f'{self.url}\nWoWInterface API failed to respond.'
+
+    def load_payload(self, response):
+        payload = response.json()
+        if 'ERROR' in payload:
+            raise RuntimeError(f'{self.url}\nThis might be a temporary error or this project is not supported '
+                               f'by WoWInterface API.')
         else:
-            try:
-                self.payload = self.http.get(f'https://api.mmoui.com/v3/game/WOW/filedetails/{project}.json').json()
-            except httpx.RequestError as e:
-                raise RuntimeError(f'{url}\nWoWInterface API failed to respond.') from e
-            if 'ERROR' in self.payload:
-                raise RuntimeError(f'{url}\nThis might be a temporary error or this project is not supported '
-                                   f'by WoWInterface API.')
-            else:
-                self.payload = self.payload[0]
+            self.payload = payload[0]
+
+    def parse_payload(self):
         self.name = self.payload['UIName'].strip().strip('\u200b')
         self.downloadUrl = self.payload['UIDownload']
-        self.changelogUrl = f'{url}#changelog'
+        self.changelogUrl = f'{self.url}#changelog'
         self.currentVersion = self.payload['UIVersion']
         self.uiVersion = None
         self.archive = None
         self.directories = []
         self.author = [self.payload['UIAuthorName']]
 
+    def get_cache_key(self):
+        return self.cache.get_key('WoWI', self.project, self.currentVersion, self.downloadUrl) if self.cache else None
+
+    def get_download(self):
+        return {'url': self.downloadUrl, 'cache': self.cache, 'key': self.get_cache_key(),
+                'digest': ('md5', self.payload['UIMD5']) if self.payload.get('UIMD5') else None}
+
     @retry()
     def get_addon(self):
-        self.archive = zipfile.ZipFile(io.BytesIO(self.http.get(self.downloadUrl).content))
+        self.load_archive(download(self.http, **self.get_download()))
+
+    def load_archive(self, payload):
+        self.archive = zipfile.ZipFile(payload)
         for file in self.archive.namelist():
             if '/' not in os.path.dirname(file):
                 self.directories.append(os.path.dirname(file))
@@ -43,4 +69,9 @@ class WoWInterfaceAddon:
             raise RuntimeError(f'{self.name}.\nProject package is corrupted or incorrectly packaged.')
 
     def install(self, path):
-        self.archive.extractall(path)
+        return extract(self.archive, path)
+
+
+class AsyncWoWInterfaceAddon(AsyncAddon, WoWInterfaceAddon):
+    def __init__(self, url, checkcache, http, cache):
+        self.setup(url, checkcache, http, cache)
@@ -1,11 +1,27 @@
+import os
+import re
 import httpx
+import asyncio
+import hashlib
+import tempfile
+from pathlib import Path
+from .Checksum import ALGORITHM
 
-__version__ = '4.8.3'
+__version__ = '4.9.0'
 __license__ = 'GPLv3'
 __copyright__ = '2019-2025, Paweł Jastrzębski <pawelj@iosphe.re>'
 __docformat__ = 'restructuredtext en'
 
 
+def retry_error(custom_error, description):
+    if custom_error:
+        return RuntimeError(custom_error)
+    elif description:
+        return RuntimeError(f'Failed to parse addon data: {description}')
+    else:
+        return RuntimeError('Unknown error during parsing addon data. There may be some issue with the website.')
+
+
 def retry(custom_error=False):
     def wraps(func):
         def inner(*args, **kwargs):
@@ -20,17 +36,96 @@ def retry(custom_error=False):
                     continue
                 else:
                     return result
-            if custom_error:
-                raise RuntimeError(custom_error) from None
-            elif description:
-                raise RuntimeError(f'Failed to parse addon data: {description}') from None
-            else:
-                raise RuntimeError('Unknown error during parsing addon data. '
-                                   'There may be some issue with the website.') from None
+            raise retry_error(custom_error, description) from None
+        return inner
+    return wraps
+
+
+def retry_async(custom_error=False):
+    def wraps(func):
+        async def inner(*args, **kwargs):
+            description = None
+            for _ in range(2):
+                try:
+                    result = await func(*args, **kwargs)
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    description = str(e).replace('Failed to parse addon data: ', '')
+                    continue
+                else:
+                    return result
+            raise retry_error(custom_error, description) from None
         return inner
     return wraps
 
 
+def download(http, url, cache=None, key=None, digest=None, **kwargs):
+    if cache and (payload := cache.get(key, digest)):
+        return payload
+    payload = tempfile.SpooledTemporaryFile(max_size=1048576)
+    with http.stream('GET', url, **kwargs) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes(chunk_size=65536):
+            payload.write(chunk)
+    payload.seek(0)
+    if cache:
+        cache.put(key, payload, digest)
+    return payload
+
+
+async def download_async(http, url, cache=None, key=None, digest=None, **kwargs):
+    if cache and (payload := await asyncio.to_thread(cache.get, key, digest)):
+        return payload
+    payload = tempfile.SpooledTemporaryFile(max_size=1048576)
+    async with http.stream('GET', url, **kwargs) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes(chunk_size=65536):
+            payload.write(chunk)
+    payload.seek(0)
+    if cache:
+        await asyncio.to_thread(cache.put, key, payload, digest)
+    return payload
+
+
+def extract(archive, path, members=None):
+    hashes = {}
+    for member in archive.infolist() if members is None else members:
+        parts = [p for p in os.path.splitdrive(member.filename)[1].split('/') if p not in ('', '.', '..')]
+        if os.path.sep == '\\':
+            parts = [re.sub(r'[:<>|"?*]', '_', p).rstrip('. ') for p in parts]
+            parts = [p for p in parts if p]
+        if not parts:
+            continue
+        target = Path(path, *parts)
+        if member.is_dir():
+            os.makedirs(target, exist_ok=True)
+            continue
+        os.makedirs(target.parent, exist_ok=True)
+        hasher = hashlib.new(ALGORITHM)
+        with archive.open(member) as source, open(target, 'wb') as destination:
+            while chunk := source.read(65536):
+                hasher.update(chunk)
+                destination.write(chunk)
+        hashes['/'.join(parts)] = hasher.hexdigest()
+    return hashes
+
+
+class AsyncAddon:
+    @retry_async()
+    async def get_metadata(self):
+        if self.payload is None:
+            try:
+                self.load_payload(await self.http.get(**self.get_payload_request()))
+            except httpx.RequestError as e:
+                raise RuntimeError(self.get_payload_error()) from e
+        self.parse_payload()
+
+    @retry_async()
+    async def get_addon(self):
+        self.load_archive(await download_async(self.http, **self.get_download()))
+
+
 class APIAuth(httpx.Auth):
     def __init__(self, header, token):
         self.header = header
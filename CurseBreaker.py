@@ -16,6 +16,8 @@ import logging
 import platform
 import pyperclip
 import subprocess
+import multiprocessing
+import concurrent.futures
 from io import BytesIO
 from PIL import Image
 from csv import reader
@@ -70,13 +72,13 @@ class TUI:
             self.headless = True
         self.setup_console()
         self.print_header()
-        self.core.init_master_config()
         # Check if executable is in good location
         if (not glob.glob('World*.app') and not glob.glob('Wow*.exe')) or \
                 not os.path.isdir(Path('Interface/AddOns')) or not os.path.isdir('WTF'):
             self.handle_shutdown('[bold red]This executable should be placed in the same directory where Wow.exe, WowCl'
                                  'assic.exe or World of Warcraft.app is located. Additionally, make sure that this WoW '
                                  'installation was started at least once.[/bold red]\n')
+        self.core.init_master_config()
         # Detect client flavor
         if 'CURSEBREAKER_FLAVOR' in os.environ:
             flavor = os.environ.get('CURSEBREAKER_FLAVOR')
@@ -104,9 +106,9 @@ class TUI:
         self.auto_update()
         try:
             self.core.init_config()
-        except RuntimeError:
-            self.handle_shutdown('[bold red]The config file is corrupted. Restore the earlier version from backup.[/bol'
-                                 'd red]\n')
+        except RuntimeError as e:
+            message = str(e) or 'The config file is corrupted. Restore the earlier version from backup.'
+            self.handle_shutdown(f'[bold red]{message}[/bold red]\n')
         self.setup_table()
         # Wago Addons URI Support
         if len(sys.argv) == 2 and sys.argv[1].startswith('wago-app://addons/'):
@@ -158,16 +160,19 @@ class TUI:
                     self.print_header()
                 try:
                     self.motd_parser()
-                    self.c_update(None, True)
-                    if self.core.backup_check():
-                        self.setup_table()
-                        self.console.print(f'\n[green]Backing up WTF directory{"!" if self.headless else ":"}[/green]')
-                        self.core.backup_wtf(None if self.headless else self.console)
-                    if self.core.config['WAUsername'] != 'DISABLED':
-                        self.console.print('')
-                        with nullcontext() if self.headless else self.console.status('Processing Wago data'):
-                            self.setup_table()
-                            self.c_wago_update(None, False)
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                        backup = executor.submit(self.core.backup_wtf, Console(quiet=True)) \
+                            if self.core.backup_check() else None
+                        self.c_update(None, True)
+                        if self.core.config['WAUsername'] != 'DISABLED':
+                            self.console.print('')
+                            with nullcontext() if self.headless else self.console.status('Processing Wago data'):
+                                self.setup_table()
+                                self.c_wago_update(None, False)
+                        if backup:
+                            with nullcontext() if self.headless else self.console.status('Backing up WTF directory'):
+                                backup.result()
+                            self.console.print('\n[green]WTF directory was backed up.[/green]')
                 except Exception as e:
                     self.handle_exception(e)
                 self.console.print('')
@@ -390,8 +395,8 @@ class TUI:
     def setup_completer(self):
         if not self.slugs:
             try:
-                self.slugs = json.load(gzip.open(io.BytesIO(
-                    self.core.http.get('https://cursebreaker.acidweb.dev/slugs-v2.json.gz').content)))
+                self.slugs = json.load(gzip.open(io.BytesIO(self.core.httpCache.get(
+                    self.core.http, 'https://cursebreaker.acidweb.dev/slugs-v2.json.gz', 86400).content)))
             except (StopIteration, UnicodeDecodeError, json.JSONDecodeError, httpx.RequestError):
                 self.slugs = {'wa': [], 'wowi': [], 'gh': []}
         addons = []
@@ -417,13 +422,15 @@ class TUI:
             'status': WordCompleter(addons, ignore_case=True),
             'orphans': None,
             'search': None,
-            'backup': None,
+            'backup': {'restore': WordCompleter(self.core.backupStore.get_snapshots(), ignore_case=True,
+                                                sentence=True)},
             'import': {'install': None},
             'export': None,
             'toggle': {'authors': None,
                        'autoupdate': None,
                        'autoupdate_delay': None,
                        'backup': None,
+                       'backup_incremental': None,
                        'channel': WordCompleter([*addons, 'global'], ignore_case=True, sentence=True),
                        'compact_mode': None,
                        'pinning': WordCompleter(addons, ignore_case=True, sentence=True),
@@ -527,6 +534,7 @@ class TUI:
                         except Exception as e:
                             exceptions.append(e)
                         progress.update(task, advance=1, refresh=True)
+            self.core.manifest.save()
             self.console.print(self.table)
         if exceptions:
             self.handle_exception(exceptions, False)
@@ -557,11 +565,12 @@ class TUI:
                             self.table.add_row('[bold black]Not installed[/bold black]', Text(addon, no_wrap=True),
                                                Text('', no_wrap=True))
                         progress.update(task, advance=1, refresh=True)
+            self.core.manifest.save()
             self.console.print(self.table)
 
-    def _c_update_process(self, addon, update, force, compact, compacted, provider):  # sourcery skip: low-code-quality
+    def _c_update_process(self, result, update, compact, compacted, provider):  # sourcery skip: low-code-quality
         name, authors, versionnew, versionold, uiversion, modified, blocked, source, sourceurl, changelog, dstate \
-            = self.core.update_addon(addon if isinstance(addon, str) else addon['URL'], update, force)
+            = result
         additionalstatus = f' [bold red]{source.upper()}[/bold red]' if source == 'Unsupported' and not provider else ''
         if versionold:
             payload = [self.parse_link(name, sourceurl, authors=authors),
@@ -582,7 +591,7 @@ class TUI:
                 payload = [f'[yellow]{"Updated" if update else "Update available"}[/yellow]{additionalstatus}',
                            payload[0], version]
         else:
-            payload = [f'[bold black]Not installed[/bold black]{additionalstatus}', Text(addon, no_wrap=True),
+            payload = [f'[bold black]Not installed[/bold black]{additionalstatus}', Text(name, no_wrap=True),
                        Text('', no_wrap=True)]
         if payload:
             if provider:
@@ -611,19 +620,28 @@ class TUI:
         exceptions = []
         with Progress('{task.completed:.0f}/{task.total}', '|', BarColumn(bar_width=None), '|',
                       console=None if self.headless else self.console) as progress:
-            task = progress.add_task('', total=len(addons), start=bool(args))
+            task = progress.add_task('', total=len(addons))
             if not args:
-                with suppress(RuntimeError, httpx.RequestError):
-                    self.core.bulk_check(addons)
-                progress.start_task(task)
+                bulkcheck = self.core.bulk_check_start(addons)
                 self.core.bulk_check_checksum(addons, progress)
             while not progress.finished:
-                for addon in addons:
-                    try:
-                        compacted = self._c_update_process(addon, update, force, compact, compacted, provider)
-                    except Exception as e:
-                        exceptions.append(e)
+                for result in self.core.update_addons([addon if isinstance(addon, str) else addon['URL']
+                                                       for addon in addons], update, force):
+                    if isinstance(result, Exception):
+                        exceptions.append(result)
+                    else:
+                        try:
+                            compacted = self._c_update_process(result, update, compact, compacted, provider)
+                        except Exception as e:
+                            exceptions.append(e)
                     progress.update(task, advance=1 if args else 0.5, refresh=True)
+            if not args:
+                try:
+                    bulkcheck.result()
+                except (RuntimeError, httpx.RequestError):
+                    pass
+                except Exception as e:
+                    exceptions.append(e)
         if addline:
             self.console.print('')
         self.console.print(self.table)
@@ -753,14 +771,16 @@ class TUI:
                                'disables the automatic addon update on startup.\n\t[green]toggle autoupdate_delay[/gree'
                                'n]\n\t\tEnables/disables the timeout before the automatic addon update.\n\t[green]toggl'
                                'e backup[/green]\n\t\tEnables/disables automatic daily backup of WTF directory.\n\t[gre'
-                               'en]toggle channel [Name][/green]\n\t\tCommand accepts an addon name (or "global") as ar'
-                               'gument.\n\t\tPrioritizes alpha/beta versions for the provided addon.\n\t[green]toggle c'
-                               'ompact_mode [/green]\n\t\tEnables/disables compact table mode that hides entries of up-'
-                               'to-date addons.\n\t[green]toggle pinning [Name][/green]\n\t\tCommand accepts an addon n'
-                               'ame as argument.\n\t\tBlocks/unblocks updating of the provided addon.\n\t[green]toggle '
-                               'sources[/green]\n\t\tEnables/disables the source column in the status table.\n\t[green]'
-                               'toggle wago [Username][/green]\n\t\tEnables/disables automatic Wago updates.\n\t\tIf a '
-                               'username is provided check will start to ignore the specified author.', highlight=False)
+                               'en]toggle backup_incremental[/green]\n\t\tEnables/disables incremental backups that sto'
+                               're each version of a file only once.\n\t[green]toggle channel [Name][/green]\n\t\tComma'
+                               'nd accepts an addon name (or "global") as argument.\n\t\tPrioritizes alpha/beta version'
+                               's for the provided addon.\n\t[green]toggle compact_mode [/green]\n\t\tEnables/disables '
+                               'compact table mode that hides entries of up-to-date addons.\n\t[green]toggle pinning [N'
+                               'ame][/green]\n\t\tCommand accepts an addon name as argument.\n\t\tBlocks/unblocks updat'
+                               'ing of the provided addon.\n\t[green]toggle sources[/green]\n\t\tEnables/disables the s'
+                               'ource column in the status table.\n\t[green]toggle wago [Username][/green]\n\t\tEnables'
+                               '/disables automatic Wago updates.\n\t\tIf a username is provided check will start to ig'
+                               'nore the specified author.', highlight=False)
             return
         args = args.strip()
         if args.startswith('channel'):
@@ -785,6 +805,10 @@ class TUI:
             status = self._c_toggle_parse('Backup', 'Enabled')
             self.console.print('Backup of WTF directory is now:',
                                '[green]ENABLED[/green]' if status else '[red]DISABLED[/red]')
+        elif args == 'backup_incremental':
+            status = self._c_toggle_parse('Backup', 'Incremental')
+            self.console.print('Incremental backup of WTF directory is now:',
+                               '[green]ENABLED[/green]' if status else '[red]DISABLED[/red]')
         elif args == 'compact_mode':
             status = self._c_toggle_parse('CompactMode')
             self.console.print('Table compact mode is now:',
@@ -808,10 +832,10 @@ class TUI:
                                ' [link=https://addons.wago.io/patreon]https://addons.wago.io/patreon[/link]\n\t[green]s'
                                'et wago_api [API key][/green]\n\t\tSets Wago API key required to access private entries'
                                '.\n\t\tIt can be obtained here: [link=https://wago.io/account]https://wago.io/account[/'
-                               'link]\n\t[green]set wago_wow_account [Account name][/green]\n\t\tSets WoW account used '
-                               'by Wago updater.\n\t\tNeeded only if compatible addons are used on more than one WoW ac'
-                               'count.\n\t[green]set gh_api [API key][/green]\n\t\tSets GitHub API key. Might be needed'
-                               ' to get around API rate limits.', highlight=False)
+                               'link]\n\t[green]set wago_wow_account [Account name][/green]\n\t\tLimits Wago updater to'
+                               ' one WoW account.\n\t\tBy default all accounts are scanned. Use - as the name to sca'
+                               'n all accounts again.\n\t[green]set gh_api [API key][/green]\n\t\tSets GitHub API'
+                               ' key. Might be needed to get around API rate limits.', highlight=False)
             return
         args = args.strip()
         if args.startswith('wago_addons_api'):
@@ -836,8 +860,9 @@ class TUI:
             else:
                 self.console.print('[green]Usage:[/green]\n\tThis command accepts API key as an argument.')
         elif args.startswith('wago_wow_account'):
-            if args := args[17:]:
-                args = args.strip()
+            if (args := args[17:].strip()) == '-':
+                self._c_set_parse('Wago updater will now scan all WoW accounts.', 'WAAccountName', '')
+            elif args:
                 if os.path.isfile(Path(f'WTF/Account/{args}/SavedVariables/WeakAuras.lua')) or \
                         os.path.isfile(Path(f'WTF/Account/{args}/SavedVariables/Plater.lua')):
                     self.console.print(f'WoW account name set to: [bold white]{args}[/bold white]')
@@ -847,30 +872,18 @@ class TUI:
                     self.console.print('Incorrect WoW account name.')
             else:
                 self.console.print('[green]Usage:[/green]\n\tThis command accepts the WoW account name as an'
-                                   ' argument.')
+                                   ' argument.\n\tUse [bold white]-[/bold white] to scan all accounts again.')
         else:
             self.console.print('Unknown option.')
 
-    def _c_wago_update_init(self, flush, verbose):
+    def _c_wago_update_init(self, flush):
         accounts = self.core.detect_accounts()
         if self.core.config['WAAccountName'] != '' and self.core.config['WAAccountName'] not in accounts:
             self.core.config['WAAccountName'] = ''
-        if len(accounts) == 0:
-            return
-        elif len(accounts) > 1 and self.core.config['WAAccountName'] == '':
-            if verbose:
-                self.console.print('More than one WoW account detected.\nPlease use [bold white]set wago_wow_accoun'
-                                   't[''/bold white] command to set the correct account name.')
-            else:
-                self.console.print('\n[green]More than one WoW account detected.[/green]\nPlease use [bold white]se'
-                                   't wago_wow_account[/bold white] command to set the correct account name.')
-            return
-        elif len(accounts) == 1 and self.core.config['WAAccountName'] == '':
-            self.core.config['WAAccountName'] = accounts[0]
-            self.core.save_config()
         if flush and len(self.core.config['WAStash']) > 0:
             self.core.config['WAStash'] = []
             self.core.save_config()
+        return accounts
 
     def _c_wago_update_status(self, addon, status):
         self.console.print(f'[green]Outdated {addon}:[/green]')
@@ -885,8 +898,8 @@ class TUI:
             if verbose:
                 self.console.print('No compatible addon is installed.')
             return
-        self._c_wago_update_init(flush, verbose)
-        wago = WagoUpdater(self.core.config, self.core.http)
+        accounts = self._c_wago_update_init(flush)
+        wago = WagoUpdater(self.core.config, self.core.http, accounts)
         if Version(__version__) >= Version(self.core.masterConfig['ConfigVersion']) and \
                 self.core.masterConfig['CBCompanionVersion'] > self.core.config['CBCompanionVersion']:
             self.core.config['CBCompanionVersion'] = self.core.masterConfig['CBCompanionVersion']
@@ -930,8 +943,19 @@ class TUI:
             else:
                 self.console.print(f'[link={url}]{url}[/link]', highlight=False)
 
-    def c_backup(self, _):
-        self.core.backup_wtf(None if self.headless else self.console)
+    def c_backup(self, args):
+        if args and args.startswith('restore'):
+            if args := args[8:].strip():
+                if args in self.core.backupStore.get_snapshots():
+                    self.core.backupStore.restore(args, Path('WTF-Backup/Restore', args))
+                    self.console.print(f'Backup restored to: [bold white]WTF-Backup/Restore/{args}[/bold white]',
+                                       highlight=False)
+                else:
+                    self.console.print('Incorrect backup name.')
+            else:
+                self.console.print('[green]Usage:[/green]\n\tThis command accepts the backup name as an argument.')
+        else:
+            self.core.backup_wtf(None if self.headless else self.console)
 
     def c_import(self, args):
         names, slugs, installed = self.core.detect_addons()
@@ -976,6 +1000,8 @@ class TUI:
                            '[green]orphans[/green]\n\tPrints list of orphaned directories and files.\n'
                            '[green]search [Keyword][/green]\n\tExecutes addon search on Wago Addons.\n'
                            '[green]backup[/green]\n\tCommand creates a backup of WTF directory.\n'
+                           '[green]backup restore [Name][/green]\n\tCommand extracts an incremental backup to WTF-Back'
+                           'up/Restore directory.\n'
                            '[green]import[/green]\n\tCommand attempts to import already installed addons.\n'
                            '[green]export[/green]\n\tCommand prints list of all installed addons in a form suitable f'
                            'or sharing.\n'
@@ -986,6 +1012,8 @@ class TUI:
                            '[green]toggle autoupdate_delay[/green]\n\tEnables/disables the timeout before the automatic'
                            ' addon update.\n'
                            '[green]toggle backup[/green]\n\tEnables/disables automatic daily backup of WTF directory.\n'
+                           '[green]toggle backup_incremental[/green]\n\tEnables/disables incremental backups that store'
+                           ' each version of a file only once.\n'
                            '[green]toggle channel [Name][/green]\n\tCommand accepts an addon name (or "global") as argu'
                            'ment.\n\tPrioritizes alpha/beta versions for the provided addon.\n'
                            '[green]toggle compact_mode [/green]\n\tEnables/disables compact table mode that hides entri'
@@ -1001,10 +1029,10 @@ class TUI:
                            '[green]set wago_api [API key][/green]\n\tSets Wago API key required to access private entri'
                            'es.\n\tIt can be obtained here: [link=https://wago.io/account]https://wago.io/account[/link'
                            ']\n'
-                           '[green]set wago_wow_account [Account name][/green]\n\tSets WoW account used by Wago updater'
-                           '.\n\tNeeded only if compatible addons are used on more than one WoW account.\n[green]set gh'
-                           '_api [API key][/green]\n\tSets GitHub API key. Might be needed to get around API rate limit'
-                           's.\n'
+                           '[green]set wago_wow_account [Account name][/green]\n\tLimits Wago updater to one WoW acco'
+                           'unt.\n\tBy default all accounts are scanned. Use - as the name to scan all accounts again.'
+                           '\n[green]set gh_api [API key][/green]\n\tSets G'
+                           'itHub API key. Might be needed to get around API rate limits.\n'
                            '[green]uri_integration[/green]\n\tEnables integration with Wago Addons and Wago page.\n\t"D'
                            'ownload with Wago App" and "Send to WeakAura Companion App" buttons.\n\n[bold green]Support'
                            'ed URL:[/bold green]\n\thttps://addons.wago.io/addons/\\[addon_name] [bold white]|[/bold wh'
@@ -1019,6 +1047,7 @@ class TUI:
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     if clientpath := os.environ.get('CURSEBREAKER_PATH'):
         os.chdir(clientpath)
     elif getattr(sys, 'frozen', False):
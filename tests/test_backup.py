@@ -0,0 +1,55 @@
+import os
+import zipfile
+from pathlib import Path
+from CB.Backup import BackupStore, write_member
+
+
+def test_write_member(tmp_path):
+    text = tmp_path / 'SavedVariables.lua'
+    text.write_bytes(b'Data = {}\n' * 100000)
+    image = tmp_path / 'Screenshot.jpg'
+    image.write_bytes(os.urandom(4096))
+    with zipfile.ZipFile(tmp_path / 'Backup.zip', 'w') as archive:
+        write_member(archive, text, 'Deflate', 6)
+        write_member(archive, image, 'Deflate', 6)
+    with zipfile.ZipFile(tmp_path / 'Backup.zip') as archive:
+        assert archive.testzip() is None
+        members = {os.path.basename(zinfo.filename): zinfo for zinfo in archive.infolist()}
+        assert members['SavedVariables.lua'].compress_type == zipfile.ZIP_DEFLATED
+        assert members['Screenshot.jpg'].compress_type == zipfile.ZIP_STORED
+        assert archive.read(members['SavedVariables.lua']) == text.read_bytes()
+
+
+def test_write_member_store(tmp_path):
+    path = tmp_path / 'SavedVariables.lua'
+    path.write_bytes(b'Data = {}\n' * 1000)
+    with zipfile.ZipFile(tmp_path / 'Backup.zip', 'w') as archive:
+        write_member(archive, path, 'Store', 6)
+    with zipfile.ZipFile(tmp_path / 'Backup.zip') as archive:
+        assert archive.infolist()[0].compress_type == zipfile.ZIP_STORED
+
+
+def test_write_member_snapshot(tmp_path):
+    path = tmp_path / 'CurseBreaker.json'
+    path.write_bytes(b'{"Addons": [1]}')
+    with zipfile.ZipFile(tmp_path / 'Backup.zip', 'w') as archive:
+        write_member(archive, path, 'Deflate', 6, b'{"Addons": []}')
+    with zipfile.ZipFile(tmp_path / 'Backup.zip') as archive:
+        assert archive.read(archive.infolist()[0]) == b'{"Addons": []}'
+
+
+def test_store_snapshot_and_restore(tmp_path, monkeypatch):
+    store = BackupStore(tmp_path / 'WTF-Backup')
+    wtf = tmp_path / 'WTF'
+    wtf.mkdir()
+    (wtf / 'Config.wtf').write_bytes(b'SET a "1"\n')
+    (wtf / 'CurseBreaker.json').write_bytes(b'{"Addons": [1]}')
+    files = [(path.relative_to(tmp_path), path.stat().st_size) for path in wtf.iterdir()]
+    monkeypatch.chdir(tmp_path)
+    store.snapshot('1', files, data={Path('WTF/CurseBreaker.json'): b'{"Addons": []}'})
+    store.snapshot('2', files)
+    store.prune(1)
+    assert store.get_snapshots() == ['2']
+    store.restore('2', tmp_path / 'Restore')
+    assert (tmp_path / 'Restore' / 'WTF' / 'Config.wtf').read_bytes() == b'SET a "1"\n'
+    assert (tmp_path / 'Restore' / 'WTF' / 'CurseBreaker.json').read_bytes() == b'{"Addons": [1]}'
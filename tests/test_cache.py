@@ -0,0 +1,92 @@
+import io
+import os
+import time
+import httpx
+import asyncio
+from CB.Cache import ArchiveCache, HTTPCache
+
+
+def test_archive_cache(tmp_path):
+    cache = ArchiveCache(tmp_path, 1)
+    key = cache.get_key('WoWI', 1, '1.0', 'https://cdn/addon.zip')
+    payload = io.BytesIO(b'archive')
+    cache.put(key, payload, ('md5', '888d0ee361af3603736f32131e7b20a2'))
+    assert payload.tell() == 0
+    with cache.get(key) as cached:
+        assert cached.read() == b'archive'
+    assert cache.get(key, ('md5', '0' * 32)) is None
+    assert cache.get(cache.get_key('WoWI', 1, '1.1', 'https://cdn/addon.zip')) is None
+
+
+def test_archive_cache_rejects_digest_mismatch(tmp_path):
+    cache = ArchiveCache(tmp_path, 1)
+    cache.put('key', io.BytesIO(b'archive'), ('md5', '0' * 32))
+    assert cache.get('key') is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(('.zip', '.tmp'))]
+
+
+def test_archive_cache_shared_index(tmp_path):
+    retail = ArchiveCache(tmp_path, 1)
+    classic = ArchiveCache(tmp_path, 1)
+    retail.put('retail', io.BytesIO(b'retail'))
+    classic.put('classic', io.BytesIO(b'classic'))
+    with retail.get('classic') as cached:
+        assert cached.read() == b'classic'
+    with classic.get('retail') as cached:
+        assert cached.read() == b'retail'
+    assert not os.path.exists(tmp_path / 'Index.lock')
+
+
+def test_archive_cache_eviction(tmp_path):
+    cache = ArchiveCache(tmp_path, 1)
+    cache.put('old', io.BytesIO(os.urandom(600000)))
+    cache.put('new', io.BytesIO(os.urandom(600000)))
+    assert cache.get('old') is None
+    cache.get('new').close()
+    stale = tmp_path / f'{"0" * 64}.zip'
+    stale.write_bytes(b'orphan')
+    os.utime(stale, (time.time() - 7200, time.time() - 7200))
+    recent = tmp_path / f'{"1" * 64}.zip'
+    recent.write_bytes(b'orphan')
+    cache.put('other', io.BytesIO(b'other'))
+    assert not stale.exists()
+    assert recent.exists()
+
+
+def test_archive_cache_stale_lock(tmp_path):
+    cache = ArchiveCache(tmp_path, 1)
+    (tmp_path / 'Index.lock').touch()
+    os.utime(tmp_path / 'Index.lock', (time.time() - 120, time.time() - 120))
+    cache.put('key', io.BytesIO(b'archive'))
+    with cache.get('key') as cached:
+        assert cached.read() == b'archive'
+
+
+def handler(request):
+    if request.headers.get('If-None-Match') == '"1"':
+        return httpx.Response(304)
+    return httpx.Response(200, headers={'ETag': '"1"'}, content=b'payload')
+
+
+def test_http_cache(tmp_path):
+    cache = HTTPCache(tmp_path)
+    http = httpx.Client(transport=httpx.MockTransport(handler))
+    assert cache.get(http, 'https://api/addon').content == b'payload'
+    revalidated = cache.get(http, 'https://api/addon')
+    assert revalidated.status_code == 200
+    assert revalidated.content == b'payload'
+    os.remove(tmp_path / f'{cache.load("https://api/addon")[0]}.bin')
+    assert cache.get(http, 'https://api/addon').content == b'payload'
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_http_cache_async(tmp_path):
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            first = await cache.get_async(http, 'https://api/addon')
+            os.remove(tmp_path / f'{cache.load("https://api/addon")[0]}.bin')
+            return first, await cache.get_async(http, 'https://api/addon')
+
+    cache = HTTPCache(tmp_path)
+    first, second = asyncio.run(main())
+    assert first.content == second.content == b'payload'
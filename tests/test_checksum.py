@@ -0,0 +1,32 @@
+import os
+import pytest
+from CB.Checksum import ChecksumManifest
+
+
+def test_dirhashes_and_save(tmp_path):
+    addon = tmp_path / 'AddOns' / 'Addon'
+    addon.mkdir(parents=True)
+    (addon / 'Addon.toc').write_bytes(b'## Title: Addon\n')
+    (addon / 'Addon.lua').write_bytes(b'print(1)\n')
+    manifest = ChecksumManifest(tmp_path / 'CurseBreaker' / 'Manifest.json')
+    first = manifest.dirhashes(tmp_path / 'AddOns', {'Addon': ['md5', 'blake2b']})
+    manifest.save()
+    assert os.listdir(tmp_path / 'CurseBreaker') == ['Manifest.json']
+    reloaded = ChecksumManifest(tmp_path / 'CurseBreaker' / 'Manifest.json')
+    assert reloaded.dirhashes(tmp_path / 'AddOns', {'Addon': ['md5', 'blake2b']}) == first
+    assert not reloaded.modified
+    (addon / 'Addon.lua').write_bytes(b'print(2)\n')
+    assert reloaded.dirhashes(tmp_path / 'AddOns', {'Addon': ['md5']})['Addon']['md5'] != first['Addon']['md5']
+
+
+def test_save_keeps_previous_manifest_on_failure(tmp_path):
+    manifest = ChecksumManifest(tmp_path / 'Manifest.json')
+    manifest.data = {'Addon': {}}
+    manifest.modified = True
+    manifest.save()
+    manifest.data = {'Addon': {'file': object()}}
+    manifest.modified = True
+    with pytest.raises(TypeError):
+        manifest.save()
+    assert os.listdir(tmp_path) == ['Manifest.json']
+    assert (tmp_path / 'Manifest.json').read_text() == '{"Addon":{}}'
@@ -0,0 +1,166 @@
+import os
+import json
+import stat
+import httpx
+import asyncio
+import threading
+import pytest
+from CB.Core import Core
+
+
+@pytest.fixture
+def core(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'Interface' / 'AddOns').mkdir(parents=True)
+    (tmp_path / 'WTF').mkdir()
+    core = Core()
+    core.config = {'Addons': [], 'IgnoreClientVersion': {}, 'WAAAPIKey': '', 'GHAPIKey': ''}
+    return core
+
+
+def test_bulk_check_plan_skips_uncovered_addons(core):
+    addons = [{'URL': 'https://www.wowinterface.com/downloads/info1-x'},
+              {'URL': 'https://addons.wago.io/addons/a'},
+              {'URL': 'https://github.com/o/r'},
+              {'URL': 'elvui:dev'}]
+    checks = core.bulk_check_plan(addons)
+    assert list(checks) == ['WoWI']
+    assert checks['WoWI'][1] == ['1']
+    assert list(core.bulkEvents) == ['https://www.wowinterface.com/downloads/info1-x']
+
+
+def test_bulk_check_plan_with_keys(core):
+    core.config['WAAAPIKey'] = 'key'
+    core.config['GHAPIKey'] = 'key'
+    addons = [{'URL': 'https://addons.wago.io/addons/a'}, {'URL': 'https://github.com/o/r'}]
+    checks = core.bulk_check_plan(addons)
+    assert checks['Wago'][1] == [{'slug': 'a', 'id': ''}]
+    assert checks['GitHub'][1] == ['o/r']
+
+
+def test_bulk_check_start_raises_unexpected_errors(core):
+    def check(_):
+        raise KeyError('UID')
+
+    core.bulk_wowi_check = check
+    future = core.bulk_check_start([{'URL': 'https://www.wowinterface.com/downloads/info1-x'}])
+    with pytest.raises(KeyError):
+        future.result()
+    assert all(event.is_set() for event in core.bulkEvents.values())
+
+
+@pytest.mark.parametrize('codec, level', [('Deflate', 10), ('Deflate', -1), ('Deflate', '6'), ('LZMA', 6)])
+def test_init_config_rejects_invalid_backup_settings(core, codec, level):
+    core.config = None
+    core.init_config()
+    core.config['Backup']['Codec'] = codec
+    core.config['Backup']['Level'] = level
+    core.save_config()
+    core.config = None
+    with pytest.raises(RuntimeError, match='backup codec'):
+        core.init_config()
+
+
+def test_save_config_keeps_mode_and_cleans_up(core, tmp_path):
+    core.save_config()
+    os.chmod(core.configPath, 0o640)
+    core.config['Addons'].append({'Name': 'A'})
+    core.save_config()
+    assert stat.S_IMODE(os.stat(core.configPath).st_mode) == 0o640
+    core.config['Addons'].append(object())
+    with pytest.raises(TypeError):
+        core.save_config()
+    assert os.listdir(tmp_path / 'WTF') == ['CurseBreaker.json']
+    with open(core.configPath) as f:
+        assert json.load(f)['Addons'] == [{'Name': 'A'}]
+
+
+def github_handler(request):
+    body = json.loads(request.content)
+    if 'search' in body['query']:
+        assets = [{'node_id': f'A{i}', 'name': f'addon-{i}.zip', 'content_type': 'application/zip', 'url': f'u{i}'}
+                  for i in range(100)]
+        release = {'node_id': 'R1', 'tag_name': 'v1', 'name': 'v1', 'html_url': 'h', 'draft': False,
+                   'prerelease': False, 'assets': {'pageInfo': {'hasNextPage': True, 'endCursor': 'C1'},
+                                                   'nodes': assets}}
+        return httpx.Response(200, json={'data': {'search': {
+            'pageInfo': {'hasNextPage': False, 'endCursor': None},
+            'nodes': [{'nameWithOwner': 'o/r', 'releases': {'nodes': [release]}}]}}})
+    assert body['variables'] == {'id': 'R1', 'after': 'C1'}
+    return httpx.Response(200, json={'data': {'node': {'assets': {
+        'pageInfo': {'hasNextPage': False, 'endCursor': None},
+        'nodes': [{'node_id': 'A100', 'name': 'addon-classic.zip', 'content_type': 'application/zip', 'url': 'u'}]}}}})
+
+
+def test_bulk_gh_check_chunk_paginates_assets(core):
+    core.config['GHAPIKey'] = 'key'
+    core.http = httpx.Client(transport=httpx.MockTransport(github_handler))
+    releases = core.bulk_gh_check_chunk(['o/r'])['o/r']
+    assert len(releases[0]['assets']) == 101
+    assert releases[0]['assets'][-1]['name'] == 'addon-classic.zip'
+
+
+def test_bulk_gh_check_chunk_skips_incomplete_assets(core):
+    def handler(request):
+        if 'search' in json.loads(request.content)['query']:
+            return github_handler(request)
+        return httpx.Response(502)
+
+    core.config['GHAPIKey'] = 'key'
+    core.http = httpx.Client(transport=httpx.MockTransport(handler))
+    assert core.bulk_gh_check_chunk(['o/r']) == {}
+
+
+class FakeAddon:
+    def __init__(self, url, event):
+        self.name = url
+        self.author = ['Author']
+        self.currentVersion = '2'
+        self.uiVersion = None
+        self.changelogUrl = None
+        self.directories = [url]
+        self.event = event
+
+    async def get_metadata(self):
+        pass
+
+    async def get_addon(self):
+        if self.event:
+            await asyncio.to_thread(self.event.wait)
+
+    def install(self, path):
+        (path / self.name).mkdir()
+        return {}
+
+
+def setup_updates(core, monkeypatch, event):
+    core.config = {'Addons': [{'Name': url, 'URL': url, 'Version': '1', 'Directories': [url], 'Checksums': {}}
+                              for url in ['elvui', 'tukui']],
+                   'IgnoreClientVersion': {}, 'WAAAPIKey': '', 'GHAPIKey': ''}
+    core.build_index()
+    monkeypatch.setattr(core, 'bulk_tukui_check', lambda: None)
+    monkeypatch.setattr(core, 'parse_url', lambda url, engine=None: FakeAddon(url, event if url == 'tukui' else None))
+
+
+def test_update_addons_saves_each_install(core, monkeypatch):
+    event = threading.Event()
+    setup_updates(core, monkeypatch, event)
+    updates = core.update_addons(['elvui', 'tukui'], True, False)
+    assert next(updates)[2] == '2'
+    with open(core.configPath) as f:
+        assert [addon['Version'] for addon in json.load(f)['Addons']] == ['2', '1']
+    event.set()
+    assert next(updates)[2] == '2'
+    with open(core.configPath) as f:
+        assert [addon['Version'] for addon in json.load(f)['Addons']] == ['2', '2']
+
+
+def test_update_addons_interrupted(core, monkeypatch):
+    event = threading.Event()
+    setup_updates(core, monkeypatch, event)
+    updates = core.update_addons(['elvui', 'tukui'], True, False)
+    next(updates)
+    updates.close()
+    event.set()
+    with open(core.configPath) as f:
+        assert [addon['Version'] for addon in json.load(f)['Addons']] == ['2', '1']
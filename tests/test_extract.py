@@ -0,0 +1,30 @@
+import io
+import hashlib
+import zipfile
+from CB import extract
+from CB.Checksum import ALGORITHM
+
+
+def make_archive():
+    payload = io.BytesIO()
+    with zipfile.ZipFile(payload, 'w') as archive:
+        archive.writestr('Addon/', '')
+        archive.writestr('Addon/Addon.toc', '## Title: Addon\n')
+        archive.writestr('../Escape.lua', 'print(1)\n')
+    return zipfile.ZipFile(payload)
+
+
+def test_extract(tmp_path):
+    hashes = extract(make_archive(), tmp_path)
+    assert (tmp_path / 'Addon' / 'Addon.toc').read_bytes() == b'## Title: Addon\n'
+    assert (tmp_path / 'Escape.lua').is_file()
+    assert not (tmp_path.parent / 'Escape.lua').exists()
+    assert hashes == {'Addon/Addon.toc': hashlib.new(ALGORITHM, b'## Title: Addon\n').hexdigest(),
+                      'Escape.lua': hashlib.new(ALGORITHM, b'print(1)\n').hexdigest()}
+
+
+def test_extract_members(tmp_path):
+    archive = make_archive()
+    assert extract(archive, tmp_path, []) == {}
+    assert list(tmp_path.iterdir()) == []
+    assert list(extract(archive, tmp_path, [archive.getinfo('Addon/Addon.toc')])) == ['Addon/Addon.toc']
@@ -0,0 +1,35 @@
+import pytest
+from CB.SLPP import ParseError, extract, loads
+
+DATA = '''{
+["displays"] = {
+["Aura"] = {
+["url"] = "https://wago.io/a/1",
+["version"] = 3,
+["big"] = {1, 2, 3},
+["enabled"] = true,
+},
+["Other"] = {
+["id"] = "Other", -- comment
+["scale"] = -1.5,
+},
+},
+["history"] = {{1}, {2}},
+}'''
+
+
+def test_loads_matches_legacy():
+    assert loads(DATA) == loads(DATA, legacy=True)
+
+
+def test_extract():
+    assert extract(DATA, {'displays': {'*': {'url': None, 'version': None}}}) == \
+        {'displays': {'Aura': {'url': 'https://wago.io/a/1', 'version': 3}, 'Other': {}}}
+    assert extract(DATA, {'history': None}) == {'history': [[1], [2]]}
+    assert extract(DATA, {'displays': {'Other': None}}) == {'displays': {'Other': {'id': 'Other', 'scale': -1.5}}}
+    assert extract(DATA, {}) == {}
+
+
+def test_extract_empty():
+    with pytest.raises(ParseError):
+        extract('', {'displays': None})